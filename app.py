@@ -8,6 +8,7 @@ from models.campaign import Campaign
 from models.ai_config import AiConfig
 from models.company_lid import CompanyLid
 from models.interaction_log import InteractionLog
+from models.interaction_rollup import InteractionRollup
 
 from dotenv import load_dotenv
 from utils.utils import super_admin_create
@@ -20,6 +21,7 @@ from models import db, migrate, bcrypt, jwt, cors, limiter, swagger
 from routes.auth_route import auth_bp
 from routes.user_route import user_bp
 from routes.main_route import main_bp
+from routes.export_route import export_bp
 from routes.company_route import company_bp
 from routes.language_route import language_bp
 from routes.campaign_route import campaign_bp
@@ -62,6 +64,7 @@ openai_client = init_openai()
 app.register_blueprint(auth_bp)
 app.register_blueprint(user_bp)
 app.register_blueprint(main_bp)
+app.register_blueprint(export_bp)
 app.register_blueprint(company_bp)
 app.register_blueprint(language_bp)
 app.register_blueprint(campaign_bp)
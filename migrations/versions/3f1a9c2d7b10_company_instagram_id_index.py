@@ -0,0 +1,25 @@
+"""company instagram_id index
+
+Revision ID: 3f1a9c2d7b10
+Revises: 
+Create Date: 2026-10-17 10:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a9c2d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() yangi bazada indexni allaqachon yaratgan bo'lishi mumkin.
+    op.create_index('ix_company_instagram_id', 'company', ['instagram_id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_company_instagram_id', table_name='company', if_exists=True)
@@ -0,0 +1,46 @@
+"""interaction rollup table
+
+Revision ID: 4d9c0b7e2f51
+Revises: e7a2b94f1c36
+Create Date: 2026-10-17 15:48:03.114820
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d9c0b7e2f51'
+down_revision = 'e7a2b94f1c36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'interaction_rollup' not in inspector.get_table_names():
+        op.create_table(
+            'interaction_rollup',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('company_id', sa.Integer(), nullable=False),
+            sa.Column('interaction_type', sa.String(length=50), nullable=False),
+            sa.Column('hour', sa.DateTime(), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('company_id', 'interaction_type', 'hour', name='uq_interaction_rollup_company_type_hour')
+        )
+        op.create_index('ix_interaction_rollup_hour', 'interaction_rollup', ['hour'], unique=False)
+
+    # Mavjud tarixni bir marta to'ldiramiz; keyingi tuzatishlar reconcile task orqali.
+    op.execute("""
+        INSERT INTO interaction_rollup (company_id, interaction_type, hour, count)
+        SELECT company_id, interaction_type, date_trunc('hour', created_at), COUNT(*)
+        FROM interaction_log
+        GROUP BY 1, 2, 3
+        ON CONFLICT (company_id, interaction_type, hour) DO UPDATE SET count = EXCLUDED.count
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_interaction_rollup_hour', table_name='interaction_rollup')
+    op.drop_table('interaction_rollup')
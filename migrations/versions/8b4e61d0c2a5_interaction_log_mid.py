@@ -0,0 +1,29 @@
+"""interaction_log mid
+
+Revision ID: 8b4e61d0c2a5
+Revises: 3f1a9c2d7b10
+Create Date: 2026-10-17 11:40:08.913554
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e61d0c2a5'
+down_revision = '3f1a9c2d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    columns = [column["name"] for column in inspector.get_columns('interaction_log')]
+    if 'mid' not in columns:
+        op.add_column('interaction_log', sa.Column('mid', sa.String(length=255), nullable=True))
+        op.create_unique_constraint('interaction_log_mid_key', 'interaction_log', ['mid'])
+
+
+def downgrade():
+    op.drop_constraint('interaction_log_mid_key', 'interaction_log', type_='unique')
+    op.drop_column('interaction_log', 'mid')
@@ -0,0 +1,27 @@
+"""user token_version
+
+Revision ID: 9e3f5a1c7d24
+Revises: 4d9c0b7e2f51
+Create Date: 2026-10-17 16:31:40.508217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e3f5a1c7d24'
+down_revision = '4d9c0b7e2f51'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    columns = [column['name'] for column in inspector.get_columns('user')]
+    if 'token_version' not in columns:
+        op.add_column('user', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('user', 'token_version')
@@ -0,0 +1,50 @@
+"""company_lid unique (company_id, user_instagram_id)
+
+Revision ID: c51d7e93a4f8
+Revises: 8b4e61d0c2a5
+Create Date: 2026-10-17 13:05:52.271940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c51d7e93a4f8'
+down_revision = '8b4e61d0c2a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    constraints = [constraint["name"] for constraint in inspector.get_unique_constraints('company_lid')]
+    if 'uq_company_lid_company_user' in constraints:
+        return
+
+    # Takroriy lidlardan eng birinchisini qoldiramiz, bo'sh ism/telefonni boshqalaridan to'ldiramiz.
+    op.execute("""
+        UPDATE company_lid AS keep
+        SET full_name = COALESCE(keep.full_name, dup.full_name),
+            phone_number = COALESCE(keep.phone_number, dup.phone_number)
+        FROM (
+            SELECT company_id, user_instagram_id, MIN(id) AS keep_id,
+                   MAX(full_name) AS full_name, MAX(phone_number) AS phone_number
+            FROM company_lid
+            GROUP BY company_id, user_instagram_id
+            HAVING COUNT(*) > 1
+        ) AS dup
+        WHERE keep.id = dup.keep_id
+    """)
+    op.execute("""
+        DELETE FROM company_lid AS a
+        USING company_lid AS b
+        WHERE a.company_id = b.company_id
+          AND a.user_instagram_id = b.user_instagram_id
+          AND a.id > b.id
+    """)
+    op.create_unique_constraint('uq_company_lid_company_user', 'company_lid', ['company_id', 'user_instagram_id'])
+
+
+def downgrade():
+    op.drop_constraint('uq_company_lid_company_user', 'company_lid', type_='unique')
@@ -0,0 +1,39 @@
+"""hot path composite indexes
+
+Revision ID: e7a2b94f1c36
+Revises: c51d7e93a4f8
+Create Date: 2026-10-17 14:22:17.655301
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a2b94f1c36'
+down_revision = 'c51d7e93a4f8'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_interaction_log_company_user_created', 'interaction_log', ['company_id', 'user_instagram_id', 'created_at']),
+    ('ix_interaction_log_company_created', 'interaction_log', ['company_id', 'created_at']),
+    ('ix_interaction_log_company_type', 'interaction_log', ['company_id', 'interaction_type']),
+    ('ix_interaction_log_created_at', 'interaction_log', ['created_at']),
+    ('ix_company_lid_company_created', 'company_lid', ['company_id', 'created_at']),
+    ('ix_campaign_company_active', 'campaign', ['company_id', 'is_active']),
+    ('ix_ai_config_company_id', 'ai_config', ['company_id']),
+]
+
+
+def upgrade():
+    # Katta jadvallarda yozishni bloklamaslik uchun CONCURRENTLY (tranzaksiyadan tashqarida).
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
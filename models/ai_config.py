@@ -9,7 +9,7 @@ class AiConfig(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
 
-    company_id = db.Column(db.Integer, nullable=False)
+    company_id = db.Column(db.Integer, nullable=False, index=True)
     template_name = db.Column(db.String(255), nullable=False)
     template_text = db.Column(db.Text, nullable=False)
     use_openai = db.Column(db.Boolean, nullable=False)
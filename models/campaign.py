@@ -6,6 +6,9 @@ time_zone = pytz.timezone("Asia/Tashkent")
 
 class Campaign(db.Model):
     __tablename__ = "campaign"
+    __table_args__ = (
+        db.Index("ix_campaign_company_active", "company_id", "is_active"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -14,7 +14,7 @@ class Company(db.Model):
     contact_number = db.Column(db.String(20), nullable=False)
     contact_email = db.Column(db.String(100), nullable=False)
     address = db.Column(db.String(255), nullable=False)
-    instagram_id = db.Column(db.String(50), nullable=False)
+    instagram_id = db.Column(db.String(50), nullable=False, index=True)
     instagram_token = db.Column(db.Text(), nullable=False)
     openai_token = db.Column(db.Text(), nullable=False)
     logo_path = db.Column(db.Text, nullable=True)
@@ -6,6 +6,10 @@ time_zone = pytz.timezone("Asia/Tashkent")
 
 class CompanyLid(db.Model):
     __tablename__ = "company_lid"
+    __table_args__ = (
+        db.UniqueConstraint("company_id", "user_instagram_id", name="uq_company_lid_company_user"),
+        db.Index("ix_company_lid_company_created", "company_id", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
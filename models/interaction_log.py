@@ -6,6 +6,12 @@ time_zone = pytz.timezone("Asia/Tashkent")
 
 class InteractionLog(db.Model):
     __tablename__ = "interaction_log"
+    __table_args__ = (
+        db.Index("ix_interaction_log_company_user_created", "company_id", "user_instagram_id", "created_at"),
+        db.Index("ix_interaction_log_company_created", "company_id", "created_at"),
+        db.Index("ix_interaction_log_company_type", "company_id", "interaction_type"),
+        db.Index("ix_interaction_log_created_at", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -15,10 +21,11 @@ class InteractionLog(db.Model):
     interaction_type = db.Column(db.String(50), nullable=False)
     message = db.Column(db.Text, nullable=False)
     ai_response = db.Column(db.Text, nullable=False)
+    mid = db.Column(db.String(255), nullable=True, unique=True)
 
     created_at = db.Column(db.DateTime(), default=lambda: datetime.now(time_zone))
 
-    def __init__(self, company_id, user_instagram_id, username, interaction_type, message, ai_response):
+    def __init__(self, company_id, user_instagram_id, username, interaction_type, message, ai_response, mid=None):
         super().__init__()
         self.company_id = company_id
         self.user_instagram_id = user_instagram_id
@@ -26,6 +33,7 @@ class InteractionLog(db.Model):
         self.interaction_type = interaction_type
         self.message = message
         self.ai_response = ai_response
+        self.mid = mid
 
     def __repr__(self):
         return f"<InteractionLog {self.username}>"
@@ -39,5 +47,6 @@ class InteractionLog(db.Model):
             "interaction_type": self.interaction_type,
             "message": self.message,
             "ai_response": self.ai_response,
+            "mid": self.mid,
             "created_at": self.created_at.isoformat()
         }
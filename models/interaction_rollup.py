@@ -0,0 +1,34 @@
+from models import db
+
+class InteractionRollup(db.Model):
+    __tablename__ = "interaction_rollup"
+    __table_args__ = (
+        db.UniqueConstraint("company_id", "interaction_type", "hour", name="uq_interaction_rollup_company_type_hour"),
+        db.Index("ix_interaction_rollup_hour", "hour"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    company_id = db.Column(db.Integer, nullable=False)
+    interaction_type = db.Column(db.String(50), nullable=False)
+    hour = db.Column(db.DateTime(), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __init__(self, company_id, interaction_type, hour, count=0):
+        super().__init__()
+        self.company_id = company_id
+        self.interaction_type = interaction_type
+        self.hour = hour
+        self.count = count
+
+    def __repr__(self):
+        return f"<InteractionRollup {self.company_id} {self.interaction_type} {self.hour}>"
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "company_id": self.company_id,
+            "interaction_type": self.interaction_type,
+            "hour": self.hour.isoformat(),
+            "count": self.count
+        }
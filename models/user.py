@@ -18,6 +18,7 @@ class User(db.Model):
     is_superadmin = db.Column(db.Boolean, default=False)
     password = db.Column(db.Text, nullable=False)
     pic_path = db.Column(db.Text, nullable=True)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime(), default=lambda: datetime.now(time_zone))
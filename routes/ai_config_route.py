@@ -3,9 +3,10 @@ from models import db
 from flask import Blueprint
 from models.user import User
 from models.company import Company
-from utils.utils import get_response
+from utils.utils import get_response, get_page_response, paginate_query
 from models.ai_config import AiConfig
 from utils.decorators import role_required
+from services.prompt_service import bump_prompt_version
 from flask_jwt_extended import get_jwt_identity
 from flask_restful import Api, Resource, reqparse
 
@@ -97,6 +98,7 @@ class AiConfigResource(Resource):
 
         db.session.delete(ai_config)
         db.session.commit()
+        bump_prompt_version(ai_config.company_id)
 
         sentry_sdk.logger.info(f"{username} - AiConfig successfully deleted")
         return get_response("Successfully deleted AiConfig", None, 200), 200
@@ -152,6 +154,7 @@ class AiConfigResource(Resource):
             return get_response("AiConfig not found", None, 404), 404
         
         data = ai_config_update_parse.parse_args()
+        old_company_id = found_ai_config.company_id
         company_id = data.get('company_id', None)
         template_name = data.get('template_name', None)
         template_text = data.get('template_text', None)
@@ -174,6 +177,9 @@ class AiConfigResource(Resource):
             found_ai_config.use_openai = use_openai
 
         db.session.commit()
+        bump_prompt_version(old_company_id)
+        if found_ai_config.company_id != old_company_id:
+            bump_prompt_version(found_ai_config.company_id)
         sentry_sdk.logger.info(f"{username} - AiConfig successfully updated")
         return get_response("Successfully updated AiConfig", None, 200), 200
 
@@ -193,18 +199,36 @@ class AiConfigListCreateResource(Resource):
               required: true
               description: Bearer token for authentication
 
+            - name: cursor
+              in: query
+              type: string
+              required: false
+              description: next_cursor from the previous page
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, default 50, maximum 200
+
         responses:
             200:
                 description: Return AiConfig List
+            400:
+                description: Invalid cursor or limit
         """
         username = get_jwt_identity()
         sentry_sdk.logger.info(f"AiConfig list attempt for user: {username}")
 
-        ai_config_list = AiConfig.query.filter_by().order_by(AiConfig.created_at.desc()).all()
+        page = paginate_query(AiConfig.query.filter_by(), AiConfig)
+        if isinstance(page, str):
+            sentry_sdk.logger.warning(f"AiConfig list failed for user: {username} - {page}")
+            return get_response(page, None, 400), 400
+        ai_config_list, next_cursor = page
         result_ai_config_list = [ai_config.to_dict() for ai_config in ai_config_list]
 
         sentry_sdk.logger.info(f"{username} - AiConfig list")
-        return get_response("AiConfig List", result_ai_config_list, 200), 200
+        return get_page_response("AiConfig List", result_ai_config_list, next_cursor, 200), 200
 
     @role_required(["SUPERADMIN", "ADMIN", "MANAGER"])
     def post(self):
@@ -253,6 +277,7 @@ class AiConfigListCreateResource(Resource):
         new_ai_config = AiConfig(company_id, template_name, template_text, use_openai)
         db.session.add(new_ai_config)
         db.session.commit()
+        bump_prompt_version(new_ai_config.company_id)
 
         sentry_sdk.logger.info(f"{username} - AiConfig successfully created")
         return get_response("Successfully created AiConfig", new_ai_config.id, 200), 200
@@ -279,9 +304,23 @@ class AiConfigCompanyListResource(Resource):
               required: true
               description: Enter Company ID
 
+            - name: cursor
+              in: query
+              type: string
+              required: false
+              description: next_cursor from the previous page
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, default 50, maximum 200
+
         responses:
             200:
                 description: Return AiConfig List
+            400:
+                description: Invalid cursor or limit
             404:
                 description: Company not found or not active
         """
@@ -293,11 +332,15 @@ class AiConfigCompanyListResource(Resource):
             sentry_sdk.logger.warning(f"AiConfig user list failed for user: {username} - Company not found or not active")
             return get_response("Company not found or not active", None, 404), 404
 
-        ai_config_list = AiConfig.query.filter_by(company_id=found_company.id).order_by(AiConfig.created_at.desc()).all()
+        page = paginate_query(AiConfig.query.filter_by(company_id=found_company.id), AiConfig)
+        if isinstance(page, str):
+            sentry_sdk.logger.warning(f"AiConfig user list failed for user: {username} - {page}")
+            return get_response(page, None, 400), 400
+        ai_config_list, next_cursor = page
         result_ai_config_list = [ai_config.to_dict() for ai_config in ai_config_list]
 
         sentry_sdk.logger.info(f"{username} - AiConfig user list")
-        return get_response("AiConfig User List", result_ai_config_list, 200), 200
+        return get_page_response("AiConfig User List", result_ai_config_list, next_cursor, 200), 200
 
 api.add_resource(AiConfigResource, "/<ai_config_id>")
 api.add_resource(AiConfigListCreateResource, "/")
@@ -5,7 +5,8 @@ from models.user import User
 from utils.utils import get_response
 from flask_restful import Api, Resource, reqparse
 from flask_bcrypt import check_password_hash, generate_password_hash
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from utils.token_utils import get_user_claims, bump_token_version, forget_token_version
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt
 
 auth_parse = reqparse.RequestParser()
 auth_parse.add_argument("username", type=str, required=True, help="Username cannot be blank")
@@ -66,8 +67,9 @@ class AuthResource(Resource):
             sentry_sdk.logger.warning(f"Login failed for user: {username} - Incorrect password")
             return get_response("Username or Password is incorrect", None, 404), 404
         
-        access_token = create_access_token(identity=user.username)
-        refresh_token = create_refresh_token(identity=user.username)
+        claims = get_user_claims(user)
+        access_token = create_access_token(identity=user.username, additional_claims=claims)
+        refresh_token = create_refresh_token(identity=user.username, additional_claims=claims)
         result_data = {
             "user": user.to_dict(),
             "access_token": access_token,
@@ -95,6 +97,8 @@ class RefreshResource(Resource):
         responses:
             200:
                 description: Return New Access Token
+            401:
+                description: Token has been revoked
             404:
                 description: User not found or not active
         """
@@ -105,8 +109,13 @@ class RefreshResource(Resource):
         if not user:
             sentry_sdk.logger.warning(f"Refresh token failed for user: {username} - User not found or not active")
             return get_response("User not found or not active", None, 404), 404
+
+        token_version = get_jwt().get("token_version")
+        if token_version is not None and token_version != user.token_version:
+            sentry_sdk.logger.warning(f"Refresh token failed for user: {username} - Token has been revoked")
+            return get_response("Token has been revoked", None, 401), 401
         
-        new_access_token = create_access_token(identity=user.username)
+        new_access_token = create_access_token(identity=user.username, additional_claims=get_user_claims(user))
         result_data = {
             "access_token": new_access_token,
         }
@@ -201,6 +210,7 @@ class ProfileResource(Resource):
         if in_username is not None:
             sentry_sdk.logger.info(f"{username} - User username update now.")
             found_user.username = in_username
+            bump_token_version(found_user)
 
         if phone_number is not None:
             sentry_sdk.logger.info(f"{username} - User phone number update now.")
@@ -211,6 +221,7 @@ class ProfileResource(Resource):
             found_user.pic_path = pic_path
 
         db.session.commit()
+        forget_token_version(found_user.id)
         sentry_sdk.logger.info(f"{username} - User successfully updated")
         return get_response("Successfully updated user", None, 200), 200
 
@@ -267,8 +278,10 @@ class ChangePasswordResource(Resource):
 
         sentry_sdk.logger.info(f"{username} - User password update now.")
         found_user.password = generate_password_hash(new_password).decode("utf-8")
+        bump_token_version(found_user)
 
         db.session.commit()
+        forget_token_version(found_user.id)
         sentry_sdk.logger.info(f"{username} - Successfully changed password")
         return get_response("Successfully changed password", None, 200), 200
 
@@ -4,8 +4,9 @@ from flask import Blueprint
 from models.user import User
 from models.company import Company
 from models.campaign import Campaign
-from utils.utils import get_response
+from utils.utils import get_response, get_page_response, paginate_query
 from utils.decorators import role_required
+from services.prompt_service import bump_prompt_version
 from flask_jwt_extended import get_jwt_identity
 from flask_restful import Api, Resource, reqparse
 
@@ -96,6 +97,7 @@ class CampaignResource(Resource):
 
         db.session.delete(campaign)
         db.session.commit()
+        bump_prompt_version(campaign.company_id)
 
         sentry_sdk.logger.info(f"{username} - Campaign successfully deleted")
         return get_response("Successfully deleted campaign", None, 200), 200
@@ -151,6 +153,7 @@ class CampaignResource(Resource):
             return get_response("Campaign not found", None, 404), 404
         
         data = campaign_update_parse.parse_args()
+        old_company_id = found_campaign.company_id
         company_id = data.get('company_id', None)
         title = data.get('title', None)
         content = data.get('content', None)
@@ -173,6 +176,9 @@ class CampaignResource(Resource):
             found_campaign.is_active = is_active
 
         db.session.commit()
+        bump_prompt_version(old_company_id)
+        if found_campaign.company_id != old_company_id:
+            bump_prompt_version(found_campaign.company_id)
         sentry_sdk.logger.info(f"{username} - Campaign successfully updated")
         return get_response("Successfully updated campaign", None, 200), 200
 
@@ -192,18 +198,36 @@ class CampaignListCreateResource(Resource):
               required: true
               description: Bearer token for authentication
 
+            - name: cursor
+              in: query
+              type: string
+              required: false
+              description: next_cursor from the previous page
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, default 50, maximum 200
+
         responses:
             200:
                 description: Return Campaign List
+            400:
+                description: Invalid cursor or limit
         """
         username = get_jwt_identity()
         sentry_sdk.logger.info(f"Campaign list attempt for user: {username}")
 
-        campaign_list = Campaign.query.filter_by().order_by(Campaign.created_at.desc()).all()
+        page = paginate_query(Campaign.query.filter_by(), Campaign)
+        if isinstance(page, str):
+            sentry_sdk.logger.warning(f"Campaign list failed for user: {username} - {page}")
+            return get_response(page, None, 400), 400
+        campaign_list, next_cursor = page
         result_campaign_list = [campaign.to_dict() for campaign in campaign_list]
 
         sentry_sdk.logger.info(f"{username} - Campaign list")
-        return get_response("Campaign List", result_campaign_list, 200), 200
+        return get_page_response("Campaign List", result_campaign_list, next_cursor, 200), 200
 
     @role_required(["SUPERADMIN", "ADMIN", "MANAGER"])
     def post(self):
@@ -249,6 +273,7 @@ class CampaignListCreateResource(Resource):
         new_campaign = Campaign(company_id, title, content)
         db.session.add(new_campaign)
         db.session.commit()
+        bump_prompt_version(new_campaign.company_id)
 
         sentry_sdk.logger.info(f"{username} - Campaign successfully created")
         return get_response("Successfully created campaign", new_campaign.id, 200), 200
@@ -274,10 +299,24 @@ class CampaignUserListResource(Resource):
               type: integer
               required: true
               description: Enter Company ID
-              
+
+            - name: cursor
+              in: query
+              type: string
+              required: false
+              description: next_cursor from the previous page
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, default 50, maximum 200
+
         responses:
             200:
                 description: Return Campaign List
+            400:
+                description: Invalid cursor or limit
             404:
                 description: Company not found or not active
         """
@@ -289,11 +328,15 @@ class CampaignUserListResource(Resource):
             sentry_sdk.logger.warning(f"Campaign user list failed for user: {username} - Company not found or not active")
             return get_response("Company not found or not active", None, 404), 404
 
-        campaign_list = Campaign.query.filter_by(company_id=found_company.id).order_by(Campaign.created_at.desc()).all()
+        page = paginate_query(Campaign.query.filter_by(company_id=found_company.id), Campaign)
+        if isinstance(page, str):
+            sentry_sdk.logger.warning(f"Campaign user list failed for user: {username} - {page}")
+            return get_response(page, None, 400), 400
+        campaign_list, next_cursor = page
         result_campaign_list = [campaign.to_dict() for campaign in campaign_list]
 
         sentry_sdk.logger.info(f"{username} - Campaign user list")
-        return get_response("Campaign User List", result_campaign_list, 200), 200
+        return get_page_response("Campaign User List", result_campaign_list, next_cursor, 200), 200
 
 api.add_resource(CampaignResource, "/<campaign_id>")
 api.add_resource(CampaignListCreateResource, "/")
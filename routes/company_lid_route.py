@@ -2,7 +2,7 @@ import sentry_sdk
 from models import db
 from flask import Blueprint
 from models.company import Company
-from utils.utils import get_response
+from utils.utils import get_response, get_page_response, paginate_query
 from models.company_lid import CompanyLid
 from utils.decorators import role_required
 from flask_jwt_extended import get_jwt_identity
@@ -129,18 +129,36 @@ class CompanyLidListResource(Resource):
               required: true
               description: Bearer token for authentication
 
+            - name: cursor
+              in: query
+              type: string
+              required: false
+              description: next_cursor from the previous page
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, default 50, maximum 200
+
         responses:
             200:
                 description: Return CompanyLid List
+            400:
+                description: Invalid cursor or limit
         """
         username = get_jwt_identity()
         sentry_sdk.logger.info(f"CompanyLid list attempt for user: {username}")
 
-        company_lid_list = CompanyLid.query.filter_by().order_by(CompanyLid.created_at.desc()).all()
+        page = paginate_query(CompanyLid.query.filter_by(), CompanyLid)
+        if isinstance(page, str):
+            sentry_sdk.logger.warning(f"CompanyLid list failed for user: {username} - {page}")
+            return get_response(page, None, 400), 400
+        company_lid_list, next_cursor = page
         result_company_lid_list = [company_lid.to_dict() for company_lid in company_lid_list]
 
         sentry_sdk.logger.info(f"{username} - CompanyLid list")
-        return get_response("CompanyLid List", result_company_lid_list, 200), 200
+        return get_page_response("CompanyLid List", result_company_lid_list, next_cursor, 200), 200
 
 class CompanyLidUserListResource(Resource):
 
@@ -163,10 +181,24 @@ class CompanyLidUserListResource(Resource):
               type: integer
               required: true
               description: Enter Company ID
-              
+
+            - name: cursor
+              in: query
+              type: string
+              required: false
+              description: next_cursor from the previous page
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, default 50, maximum 200
+
         responses:
             200:
                 description: Return CompanyLid List
+            400:
+                description: Invalid cursor or limit
             404:
                 description: Company not found or not active
         """
@@ -178,11 +210,15 @@ class CompanyLidUserListResource(Resource):
             sentry_sdk.logger.warning(f"CompanyLid user list failed for user: {username} - Company not found or not active")
             return get_response("Company not found or not active", None, 404), 404
 
-        company_lid_list = CompanyLid.query.filter_by(company_id=found_company.id).order_by(CompanyLid.created_at.desc()).all()
+        page = paginate_query(CompanyLid.query.filter_by(company_id=found_company.id), CompanyLid)
+        if isinstance(page, str):
+            sentry_sdk.logger.warning(f"CompanyLid user list failed for user: {username} - {page}")
+            return get_response(page, None, 400), 400
+        company_lid_list, next_cursor = page
         result_company_lid_list = [company_lid.to_dict() for company_lid in company_lid_list]
 
         sentry_sdk.logger.info(f"{username} - CompanyLid user list")
-        return get_response("CompanyLid User List", result_company_lid_list, 200), 200
+        return get_page_response("CompanyLid User List", result_company_lid_list, next_cursor, 200), 200
 
 api.add_resource(CompanyLidResource, "/<company_lid_id>")
 api.add_resource(CompanyLidListResource, "/")
@@ -1,14 +1,14 @@
+import redis
 import sentry_sdk
 from models import db
 from flask import Blueprint
 from models.user import User
 from models.company import Company
-from models.campaign import Campaign
-from utils.utils import get_response
-from models.ai_config import AiConfig
+from utils.utils import get_response, get_page_response, paginate_query
 from flask_jwt_extended import get_jwt_identity
-from models.interaction_log import InteractionLog
 from flask_restful import Api, Resource, reqparse
+from services.prompt_service import bump_prompt_version
+from services.company_service import invalidate_instagram_company, start_company_delete, get_company_delete_job
 from utils.decorators import role_required, super_admin_required
 
 company_create_parse = reqparse.RequestParser()
@@ -95,10 +95,12 @@ class CompanyResource(Resource):
               required: true
               description: Enter Company ID
         responses:
-            200:
-                description: Delete a Company
+            202:
+                description: Company deactivated, data delete job queued
             404:
                 description: Company not found
+            503:
+                description: Company delete could not be started
         """
         username = get_jwt_identity()
         sentry_sdk.logger.info(f"Company delete attempt for user: {username}")
@@ -108,31 +110,14 @@ class CompanyResource(Resource):
             sentry_sdk.logger.warning(f"Company delete failed for user: {username} - Company not found")
             return get_response("Company not found", None, 404), 404
         
-        sentry_sdk.logger.info(f"Company delete user list attempt for user: {username}")
-        user_list = User.query.filter_by(company_id=company.id).all()
-        for user in user_list:
-            db.session.delete(user)
-        
-        sentry_sdk.logger.info(f"Company delete campaign list attempt for user: {username}")
-        campaign_list = Campaign.query.filter_by(company_id=company.id).all()
-        for campaign in campaign_list:
-            db.session.delete(campaign)
-        
-        sentry_sdk.logger.info(f"Company delete ai config list attempt for user: {username}")
-        ai_config_list = AiConfig.query.filter_by(company_id=company.id).all()
-        for ai_config in ai_config_list:
-            db.session.delete(ai_config)
-        
-        sentry_sdk.logger.info(f"Company delete interaction log list attempt for user: {username}")
-        interaction_log_list = InteractionLog.query.filter_by(company_id=company.id).all()
-        for interaction_log in interaction_log_list:
-            db.session.delete(interaction_log)
-
-        db.session.delete(company)
-        db.session.commit()
-
-        sentry_sdk.logger.info(f"{username} - Company successfully deleted")
-        return get_response("Successfully deleted company", None, 200), 200
+        try:
+            job_id = start_company_delete(company)
+        except Exception as e:
+            sentry_sdk.logger.error(f"Company delete failed for user: {username} - {str(e)}")
+            return get_response("Company delete could not be started", None, 503), 503
+
+        sentry_sdk.logger.info(f"{username} - Company delete queued, job - {job_id}")
+        return get_response("Company delete queued", {"job_id": job_id}, 202), 202
     
     @role_required(["SUPERADMIN", "ADMIN"])
     def patch(self, company_id):
@@ -195,6 +180,7 @@ class CompanyResource(Resource):
             return get_response("Company not found", None, 404), 404
         
         data = company_update_parse.parse_args()
+        old_instagram_id = found_company.instagram_id
         title = data.get('title', None)
         description = data.get('description', None)
         contact_number = data.get('contact_number', None)
@@ -247,6 +233,8 @@ class CompanyResource(Resource):
             found_company.is_active = is_active
 
         db.session.commit()
+        bump_prompt_version(found_company.id)
+        invalidate_instagram_company(old_instagram_id, found_company.instagram_id)
         sentry_sdk.logger.info(f"{username} - Company successfully updated")
         return get_response("Successfully updated company", None, 200), 200
 
@@ -266,18 +254,36 @@ class CompanyListCreateResource(Resource):
               required: true
               description: Bearer token for authentication
 
+            - name: cursor
+              in: query
+              type: string
+              required: false
+              description: next_cursor from the previous page
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, default 50, maximum 200
+
         responses:
             200:
                 description: Return Company List
+            400:
+                description: Invalid cursor or limit
         """
         username = get_jwt_identity()
         sentry_sdk.logger.info(f"Company list attempt for user: {username}")
 
-        company_list = Company.query.filter_by().order_by(Company.created_at.desc()).all()
+        page = paginate_query(Company.query.filter_by(), Company)
+        if isinstance(page, str):
+            sentry_sdk.logger.warning(f"Company list failed for user: {username} - {page}")
+            return get_response(page, None, 400), 400
+        company_list, next_cursor = page
         result_company_list = [company.to_dict() for company in company_list]
 
         sentry_sdk.logger.info(f"{username} - Company list")
-        return get_response("Company List", result_company_list, 200), 200
+        return get_page_response("Company List", result_company_list, next_cursor, 200), 200
 
     @super_admin_required()
     def post(self):
@@ -366,9 +372,23 @@ class CompanyUserListResource(Resource):
               required: true
               description: Bearer token for authentication
 
+            - name: cursor
+              in: query
+              type: string
+              required: false
+              description: next_cursor from the previous page
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, default 50, maximum 200
+
         responses:
             200:
                 description: Return Company List
+            400:
+                description: Invalid cursor or limit
             404:
                 description: User not found or not active
         """
@@ -380,12 +400,63 @@ class CompanyUserListResource(Resource):
             sentry_sdk.logger.warning(f"Company user list failed for user: {username} - User not found or not active")
             return get_response("User not found or not active", None, 404), 404
 
-        company_list = Company.query.filter_by(id=found_user.company_id).order_by(Company.created_at.desc()).all()
+        page = paginate_query(Company.query.filter_by(id=found_user.company_id), Company)
+        if isinstance(page, str):
+            sentry_sdk.logger.warning(f"Company user list failed for user: {username} - {page}")
+            return get_response(page, None, 400), 400
+        company_list, next_cursor = page
         result_company_list = [company.to_dict() for company in company_list]
 
         sentry_sdk.logger.info(f"{username} - Company user list")
-        return get_response("Company User List", result_company_list, 200), 200
+        return get_page_response("Company User List", result_company_list, next_cursor, 200), 200
+
+class CompanyDeleteJobResource(Resource):
+
+    @super_admin_required()
+    def get(self, job_id):
+        """Company Delete Job Status API
+        Path - /api/company/delete_job/<job_id>
+        Method - GET
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: job_id
+              in: path
+              type: string
+              required: true
+              description: Enter Job ID
+
+        responses:
+            200:
+                description: Return job status and deleted row counts per table
+            404:
+                description: Job not found
+            503:
+                description: Job status is not available
+        """
+        username = get_jwt_identity()
+        sentry_sdk.logger.info(f"Company delete job get attempt for user: {username}")
+
+        try:
+            job = get_company_delete_job(job_id)
+        except redis.RedisError as e:
+            sentry_sdk.logger.error(f"Company delete job get failed for user: {username} - {str(e)}")
+            return get_response("Job status is not available", None, 503), 503
+
+        if not job:
+            sentry_sdk.logger.warning(f"Company delete job get failed for user: {username} - Job not found")
+            return get_response("Job not found", None, 404), 404
+
+        sentry_sdk.logger.info(f"{username} - Company delete job")
+        return get_response("Company Delete Job", job, 200), 200
 
 api.add_resource(CompanyResource, "/<company_id>")
 api.add_resource(CompanyListCreateResource, "/")
 api.add_resource(CompanyUserListResource, "/user")
+api.add_resource(CompanyDeleteJobResource, "/delete_job/<job_id>")
@@ -0,0 +1,413 @@
+import os, io, csv, json
+import sentry_sdk
+from datetime import datetime, date
+from models.company import Company
+from utils.utils import get_response, parse_tashkent_datetime
+from models.company_lid import CompanyLid
+from utils.decorators import role_required
+from flask_jwt_extended import get_jwt_identity
+from models.interaction_log import InteractionLog
+from flask_restful import Api, Resource, reqparse
+from flask import Blueprint, Response, stream_with_context, send_file
+from services.snapshot_service import SNAPSHOT_TABLES, get_snapshot_path, list_snapshot_dates, write_parquet_snapshot
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 1000))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+INTERACTION_LOG_COLUMNS = ["id", "company_id", "user_instagram_id", "username", "interaction_type", "message", "ai_response", "mid", "created_at"]
+COMPANY_LID_COLUMNS = ["id", "company_id", "user_instagram_id", "username", "full_name", "phone_number", "when_call", "interest", "status", "message", "created_at"]
+
+export_parse = reqparse.RequestParser()
+export_parse.add_argument("format", type=str, location="args")
+export_parse.add_argument("start", type=str, location="args")
+export_parse.add_argument("end", type=str, location="args")
+
+snapshot_create_parse = reqparse.RequestParser()
+snapshot_create_parse.add_argument("date", type=str)
+
+export_bp = Blueprint("export", __name__, url_prefix="/api/export")
+api = Api(export_bp)
+
+def parse_export_args():
+    """
+    format, start, end query parametrlari (vaqtlar Asia/Tashkent'ga o'tkaziladi). Xato bo'lsa xabar matnini qaytaradi.
+    """
+    data = export_parse.parse_args()
+    export_format = data.get("format") or "ndjson"
+    if export_format not in EXPORT_FORMATS:
+        return "Format must be one of ndjson, csv"
+
+    result = {"format": export_format, "start": None, "end": None}
+    for name in ("start", "end"):
+        if data.get(name):
+            result[name] = parse_tashkent_datetime(data[name])
+            if result[name] is None:
+                return f"{name.capitalize()} is invalid"
+
+    if result["start"] and result["end"] and result["end"] <= result["start"]:
+        return "End must be after start"
+    return result
+
+def generate_ndjson(query):
+    buffer = []
+    for item in query:
+        buffer.append(json.dumps(item.to_dict(), ensure_ascii=False))
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+def generate_csv(query, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for index, item in enumerate(query, 1):
+        row = item.to_dict()
+        writer.writerow([row[column] for column in columns])
+        if index % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+def export_response(model, columns, name, company, export_args):
+    """
+    Server-side cursor (yield_per) bilan o'qib, javobni bo'laklab yuboradi - xotira qator soniga bog'liq emas.
+    """
+    query = model.query.filter(model.company_id == company.id)
+    if export_args["start"]:
+        query = query.filter(model.created_at >= export_args["start"])
+    if export_args["end"]:
+        query = query.filter(model.created_at < export_args["end"])
+    query = query.order_by(model.created_at, model.id).yield_per(EXPORT_CHUNK_SIZE)
+
+    export_format = export_args["format"]
+    if export_format == "csv":
+        body = generate_csv(query, columns)
+    else:
+        body = generate_ndjson(query)
+
+    filename = f"{name}_{company.id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+class InteractionLogExportResource(Resource):
+
+    @role_required(["SUPERADMIN", "ADMIN", "MANAGER", "OPERATOR"], company_scope=True)
+    def get(self, company_id):
+        """InteractionLog Export API
+        Path - /api/export/interaction_log/<company_id>
+        Method - GET
+        ---
+        produces:
+            - application/x-ndjson
+            - text/csv
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: company_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Company ID
+
+            - name: format
+              in: query
+              type: string
+              enum: [ndjson, csv]
+              required: false
+              description: Export format, default ndjson
+
+            - name: start
+              in: query
+              type: string
+              required: false
+              description: Start date or datetime, inclusive, Asia/Tashkent unless an offset is given
+
+            - name: end
+              in: query
+              type: string
+              required: false
+              description: End date or datetime, exclusive, Asia/Tashkent unless an offset is given
+
+        responses:
+            200:
+                description: Stream InteractionLog rows
+            400:
+                description: Invalid format, start or end
+            403:
+                description: Permission denied
+            404:
+                description: Company not found or not active
+        """
+        username = get_jwt_identity()
+        sentry_sdk.logger.info(f"InteractionLog export attempt for user: {username}")
+
+        found_company = Company.query.filter_by(id=company_id, is_active=True).first()
+        if not found_company:
+            sentry_sdk.logger.warning(f"InteractionLog export failed for user: {username} - Company not found or not active")
+            return get_response("Company not found or not active", None, 404), 404
+
+        export_args = parse_export_args()
+        if isinstance(export_args, str):
+            sentry_sdk.logger.warning(f"InteractionLog export failed for user: {username} - {export_args}")
+            return get_response(export_args, None, 400), 400
+
+        sentry_sdk.logger.info(f"{username} - InteractionLog export, company_id - {found_company.id}, format - {export_args['format']}")
+        return export_response(InteractionLog, INTERACTION_LOG_COLUMNS, "interaction_log", found_company, export_args)
+
+class CompanyLidExportResource(Resource):
+
+    @role_required(["SUPERADMIN", "ADMIN", "MANAGER", "OPERATOR"], company_scope=True)
+    def get(self, company_id):
+        """CompanyLid Export API
+        Path - /api/export/company_lid/<company_id>
+        Method - GET
+        ---
+        produces:
+            - application/x-ndjson
+            - text/csv
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: company_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Company ID
+
+            - name: format
+              in: query
+              type: string
+              enum: [ndjson, csv]
+              required: false
+              description: Export format, default ndjson
+
+            - name: start
+              in: query
+              type: string
+              required: false
+              description: Start date or datetime, inclusive, Asia/Tashkent unless an offset is given
+
+            - name: end
+              in: query
+              type: string
+              required: false
+              description: End date or datetime, exclusive, Asia/Tashkent unless an offset is given
+
+        responses:
+            200:
+                description: Stream CompanyLid rows
+            400:
+                description: Invalid format, start or end
+            403:
+                description: Permission denied
+            404:
+                description: Company not found or not active
+        """
+        username = get_jwt_identity()
+        sentry_sdk.logger.info(f"CompanyLid export attempt for user: {username}")
+
+        found_company = Company.query.filter_by(id=company_id, is_active=True).first()
+        if not found_company:
+            sentry_sdk.logger.warning(f"CompanyLid export failed for user: {username} - Company not found or not active")
+            return get_response("Company not found or not active", None, 404), 404
+
+        export_args = parse_export_args()
+        if isinstance(export_args, str):
+            sentry_sdk.logger.warning(f"CompanyLid export failed for user: {username} - {export_args}")
+            return get_response(export_args, None, 400), 400
+
+        sentry_sdk.logger.info(f"{username} - CompanyLid export, company_id - {found_company.id}, format - {export_args['format']}")
+        return export_response(CompanyLid, COMPANY_LID_COLUMNS, "company_lid", found_company, export_args)
+
+class SnapshotListCreateResource(Resource):
+
+    @role_required(["SUPERADMIN", "ADMIN", "MANAGER"], company_scope=True)
+    def get(self, company_id):
+        """Parquet Snapshot List API
+        Path - /api/export/snapshot/<company_id>
+        Method - GET
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: company_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Company ID
+
+        responses:
+            200:
+                description: Return snapshot dates per table
+            403:
+                description: Permission denied
+            404:
+                description: Company not found
+        """
+        username = get_jwt_identity()
+        sentry_sdk.logger.info(f"Snapshot list attempt for user: {username}")
+
+        found_company = Company.query.filter_by(id=company_id).first()
+        if not found_company:
+            sentry_sdk.logger.warning(f"Snapshot list failed for user: {username} - Company not found")
+            return get_response("Company not found", None, 404), 404
+
+        result = {table_name: list_snapshot_dates(table_name, found_company.id) for table_name in SNAPSHOT_TABLES}
+
+        sentry_sdk.logger.info(f"{username} - Snapshot list")
+        return get_response("Snapshot List", result, 200), 200
+
+    @role_required(["SUPERADMIN"])
+    def post(self, company_id):
+        """Parquet Snapshot Create API
+        Path - /api/export/snapshot/<company_id>
+        Method - POST
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: company_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Company ID
+
+            - name: body
+              in: body
+              required: false
+              schema:
+                type: object
+                properties:
+                    date:
+                        type: string
+                        example: "2026-10-16"
+        responses:
+            202:
+                description: Snapshot task queued
+            400:
+                description: Date is invalid
+            404:
+                description: Company not found
+        """
+        username = get_jwt_identity()
+        sentry_sdk.logger.info(f"Snapshot create attempt for user: {username}")
+
+        found_company = Company.query.filter_by(id=company_id).first()
+        if not found_company:
+            sentry_sdk.logger.warning(f"Snapshot create failed for user: {username} - Company not found")
+            return get_response("Company not found", None, 404), 404
+
+        data = snapshot_create_parse.parse_args()
+        snapshot_date = data.get("date")
+        if snapshot_date:
+            try:
+                snapshot_date = date.fromisoformat(snapshot_date).isoformat()
+            except ValueError:
+                sentry_sdk.logger.warning(f"Snapshot create failed for user: {username} - Date is invalid")
+                return get_response("Date is invalid", None, 400), 400
+
+        task = write_parquet_snapshot.delay(found_company.id, snapshot_date)
+
+        sentry_sdk.logger.info(f"{username} - Snapshot create queued, company_id - {found_company.id}, task - {task.id}")
+        return get_response("Snapshot task queued", {"task_id": task.id}, 202), 202
+
+class SnapshotDownloadResource(Resource):
+
+    @role_required(["SUPERADMIN", "ADMIN", "MANAGER"], company_scope=True)
+    def get(self, company_id, table_name, snapshot_date):
+        """Parquet Snapshot Download API
+        Path - /api/export/snapshot/<company_id>/<table_name>/<snapshot_date>
+        Method - GET
+        ---
+        produces:
+            - application/vnd.apache.parquet
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: company_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Company ID
+
+            - name: table_name
+              in: path
+              type: string
+              enum: [interaction_log, company_lid]
+              required: true
+              description: Snapshot table
+
+            - name: snapshot_date
+              in: path
+              type: string
+              required: true
+              description: Snapshot date, YYYY-MM-DD
+
+        responses:
+            200:
+                description: Parquet file
+            400:
+                description: Table or date is invalid
+            403:
+                description: Permission denied
+            404:
+                description: Snapshot not found
+        """
+        username = get_jwt_identity()
+        sentry_sdk.logger.info(f"Snapshot download attempt for user: {username}")
+
+        if table_name not in SNAPSHOT_TABLES:
+            sentry_sdk.logger.warning(f"Snapshot download failed for user: {username} - Table is invalid")
+            return get_response("Table is invalid", None, 400), 400
+
+        try:
+            company_id = int(company_id)
+            snapshot_date = date.fromisoformat(snapshot_date)
+        except ValueError:
+            sentry_sdk.logger.warning(f"Snapshot download failed for user: {username} - Company ID or date is invalid")
+            return get_response("Company ID or date is invalid", None, 400), 400
+
+        path = os.path.abspath(get_snapshot_path(table_name, company_id, snapshot_date))
+        if not os.path.isfile(path):
+            sentry_sdk.logger.warning(f"Snapshot download failed for user: {username} - Snapshot not found")
+            return get_response("Snapshot not found", None, 404), 404
+
+        sentry_sdk.logger.info(f"{username} - Snapshot download, {table_name}, company_id - {company_id}, date - {snapshot_date}")
+        return send_file(path, mimetype="application/vnd.apache.parquet", as_attachment=True, download_name=f"{table_name}_{company_id}_{snapshot_date.isoformat()}.parquet")
+
+api.add_resource(InteractionLogExportResource, "/interaction_log/<company_id>")
+api.add_resource(CompanyLidExportResource, "/company_lid/<company_id>")
+api.add_resource(SnapshotListCreateResource, "/snapshot/<company_id>")
+api.add_resource(SnapshotDownloadResource, "/snapshot/<company_id>/<table_name>/<snapshot_date>")
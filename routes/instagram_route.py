@@ -1,12 +1,52 @@
 import os
+import redis
 import sentry_sdk
-from models.company import Company
+from celery import group
 from utils.utils import get_response
 from flask_restful import Api, Resource
 from flask import Blueprint, Response, request
-from services.instagram_service import process_dm
+from services.instagram_service import buffer_dm_events
+from services.company_service import resolve_instagram_companies
+from utils.redis_client_config import get_redis_client
 
 VERIFY_TOKEN = os.getenv("IG_VERIFY_TOKEN")
+IG_MID_DEDUP_TTL = int(os.getenv("IG_MID_DEDUP_TTL", 86400))
+
+def filter_new_events(events):
+    """
+    Instagram qayta yuborgan (mid bo'yicha allaqachon qabul qilingan) xabarlarni tashlab yuborish.
+    """
+    mid_events = [event for event in events if event[3]]
+    if not mid_events:
+        return events
+
+    try:
+        pipeline = get_redis_client().pipeline(transaction=False)
+        for event in mid_events:
+            pipeline.set(f"ig_mid:{event[3]}", 1, nx=True, ex=IG_MID_DEDUP_TTL)
+        is_new_list = pipeline.execute()
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Instagram webhook mid dedup error - {str(e)}")
+        return events
+
+    is_new_flags = iter(is_new_list)
+    new_events = []
+    for event in events:
+        if event[3] and not next(is_new_flags):
+            sentry_sdk.logger.warning(f"Instagram webhook duplicate delivery skipped - mid {event[3]}")
+            continue
+        new_events.append(event)
+    return new_events
+
+def release_events(events):
+    mids = [f"ig_mid:{event[3]}" for event in events if event[3]]
+    if not mids:
+        return
+
+    try:
+        get_redis_client().delete(*mids)
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Instagram webhook mid release error - {str(e)}")
 
 instagram_bp = Blueprint("instagram", __name__)
 api = Api(instagram_bp)
@@ -28,24 +68,42 @@ class InstagramResource(Resource):
         data = request.json
         sentry_sdk.logger.warning(f"Instagram webhook post data - {data}")
         try:
-            entry = data["entry"][0]
-            messaging = entry["messaging"][0]
+            events = []
+            for entry in data.get("entry", []):
+                for messaging in entry.get("messaging", []):
+                    message = messaging.get("message") or {}
+                    if message.get("is_echo", None) or "text" not in message:
+                        continue
+                    events.append((entry["id"], message["text"], messaging["sender"]["id"], message.get("mid")))
 
-            message = messaging["message"]['text']
-            sender_id = messaging["sender"]['id']
-
-            is_echo = messaging["message"].get("is_echo", None)
-            if is_echo:
+            events = filter_new_events(events)
+            if not events:
                 return {"status": "ok"}, 200
 
-            instagram_id = entry["id"]
-            found_company = Company.query.filter_by(instagram_id=instagram_id).first()
-            if not found_company:
-                sentry_sdk.logger.warning(f"Instagram webhook failed - Company not found")
+            instagram_ids = {event[0] for event in events}
+            company_ids = resolve_instagram_companies(instagram_ids)
+
+            dm_events = []
+            for instagram_id, message, sender_id, mid in events:
+                company_id = company_ids.get(instagram_id)
+                if company_id is None:
+                    sentry_sdk.logger.warning(f"Instagram webhook failed - Company not found, instagram_id - {instagram_id}")
+                    continue
+
+                sentry_sdk.logger.warning(f"Instagram webhook post = message - {message}, sender_id - {sender_id}, company_id - {company_id}")
+                dm_events.append((message, sender_id, company_id, mid))
+
+            if not dm_events:
                 return get_response("Company not found", None, 404), 404
 
-            sentry_sdk.logger.warning(f"Instagram webhook post = message - {message}, sender_id - {sender_id}, company_id - {found_company.id}")
-            process_dm.delay(message, sender_id, found_company.id)
+            try:
+                tasks = buffer_dm_events(dm_events)
+                if tasks:
+                    group(tasks).apply_async()
+            except Exception:
+                # Navbatga qo'yilmagan xabarlar Instagram qayta yuborganda qabul qilinishi uchun.
+                release_events(events)
+                raise
             return {"status": "ok"}, 200
 
         except Exception as e:
@@ -2,11 +2,13 @@ import sentry_sdk
 from models import db
 from flask import Blueprint
 from models.company import Company
-from utils.utils import get_response
+from utils.utils import get_response, get_page_response, paginate_query
 from flask_restful import Api, Resource
 from utils.decorators import role_required
 from flask_jwt_extended import get_jwt_identity
 from models.interaction_log import InteractionLog
+from services.report_service import remove_interaction_rollup
+from services.conversation_service import clear_conversation_history
 
 interaction_log_bp = Blueprint("interaction_log", __name__, url_prefix="/api/interaction_log")
 api = Api(interaction_log_bp)
@@ -82,8 +84,10 @@ class InteractionLogResource(Resource):
             sentry_sdk.logger.warning(f"InteractionLog delete failed for user: {username} - InteractionLog not found")
             return get_response("InteractionLog not found", None, 404), 404
 
+        remove_interaction_rollup(interaction_log.id)
         db.session.delete(interaction_log)
         db.session.commit()
+        clear_conversation_history(interaction_log.company_id, interaction_log.user_instagram_id)
 
         sentry_sdk.logger.info(f"{username} - InteractionLog successfully deleted")
         return get_response("Successfully deleted InteractionLog", None, 200), 200
@@ -104,18 +108,36 @@ class InteractionLogListResource(Resource):
               required: true
               description: Bearer token for authentication
 
+            - name: cursor
+              in: query
+              type: string
+              required: false
+              description: next_cursor from the previous page
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, default 50, maximum 200
+
         responses:
             200:
                 description: Return InteractionLog List
+            400:
+                description: Invalid cursor or limit
         """
         username = get_jwt_identity()
         sentry_sdk.logger.info(f"InteractionLog list attempt for user: {username}")
 
-        interaction_log_list = InteractionLog.query.filter_by().order_by(InteractionLog.created_at.desc()).all()
+        page = paginate_query(InteractionLog.query.filter_by(), InteractionLog)
+        if isinstance(page, str):
+            sentry_sdk.logger.warning(f"InteractionLog list failed for user: {username} - {page}")
+            return get_response(page, None, 400), 400
+        interaction_log_list, next_cursor = page
         result_interaction_log_list = [interaction_log.to_dict() for interaction_log in interaction_log_list]
 
         sentry_sdk.logger.info(f"{username} - InteractionLog list")
-        return get_response("InteractionLog List", result_interaction_log_list, 200), 200
+        return get_page_response("InteractionLog List", result_interaction_log_list, next_cursor, 200), 200
 
 class InteractionLogCompanyListResource(Resource):
 
@@ -139,9 +161,23 @@ class InteractionLogCompanyListResource(Resource):
               required: true
               description: Enter Company ID
 
+            - name: cursor
+              in: query
+              type: string
+              required: false
+              description: next_cursor from the previous page
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, default 50, maximum 200
+
         responses:
             200:
                 description: Return InteractionLog List
+            400:
+                description: Invalid cursor or limit
             404:
                 description: Company not found or not active
         """
@@ -153,11 +189,15 @@ class InteractionLogCompanyListResource(Resource):
             sentry_sdk.logger.warning(f"InteractionLog user list failed for user: {username} - Company not found or not active")
             return get_response("Company not found or not active", None, 404), 404
 
-        interaction_log_list = InteractionLog.query.filter_by(company_id=found_company.id).order_by(InteractionLog.created_at.desc()).all()
+        page = paginate_query(InteractionLog.query.filter_by(company_id=found_company.id), InteractionLog)
+        if isinstance(page, str):
+            sentry_sdk.logger.warning(f"InteractionLog user list failed for user: {username} - {page}")
+            return get_response(page, None, 400), 400
+        interaction_log_list, next_cursor = page
         result_interaction_log_list = [interaction_log.to_dict() for interaction_log in interaction_log_list]
 
         sentry_sdk.logger.info(f"{username} - InteractionLog user list")
-        return get_response("InteractionLog User List", result_interaction_log_list, 200), 200
+        return get_page_response("InteractionLog User List", result_interaction_log_list, next_cursor, 200), 200
 
 api.add_resource(InteractionLogResource, "/<interaction_log_id>")
 api.add_resource(InteractionLogListResource, "/")
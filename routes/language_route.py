@@ -1,6 +1,6 @@
 from models import db
 from flask import Blueprint
-from utils.utils import get_response
+from utils.utils import get_response, get_page_response, paginate_query
 from models.language import Language
 from utils.decorators import super_admin_required
 from flask_restful import Api, Resource, reqparse
@@ -147,13 +147,31 @@ class LanguageListCreateResource(Resource):
         Method - GET
         ---
         consumes: application/json
+        parameters:
+            - name: cursor
+              in: query
+              type: string
+              required: false
+              description: next_cursor from the previous page
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, default 50, maximum 200
+
         responses:
             200:
                 description: Return Language List
+            400:
+                description: Invalid cursor or limit
         """
-        language_list = Language.query.filter_by().order_by(Language.created_at.desc()).all()
+        page = paginate_query(Language.query.filter_by(), Language)
+        if isinstance(page, str):
+            return get_response(page, None, 400), 400
+        language_list, next_cursor = page
         result_language_list = [Language.to_dict(language) for language in language_list]
-        return get_response("Language List", result_language_list, 200), 200
+        return get_page_response("Language List", result_language_list, next_cursor, 200), 200
     
     @super_admin_required()
     def post(self):
@@ -1,15 +1,151 @@
+import pytz
 import sentry_sdk
+from models import db
 from flask import Blueprint
+from sqlalchemy import func
 from models.user import User
 from datetime import datetime
 from models.company import Company
-from utils.utils import get_response
-from flask_restful import Api, Resource
+from utils.utils import get_response, parse_tashkent_datetime
+from flask_restful import Api, Resource, reqparse
 from datetime import datetime, timedelta
 from models.company_lid import CompanyLid
 from utils.decorators import role_required
 from flask_jwt_extended import get_jwt_identity
 from models.interaction_log import InteractionLog
+from models.interaction_rollup import InteractionRollup
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+REPORT_BUCKETS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1)
+}
+MAX_REPORT_BUCKETS = 2000
+
+report_parse = reqparse.RequestParser()
+report_parse.add_argument("start", type=str, location="args")
+report_parse.add_argument("end", type=str, location="args")
+report_parse.add_argument("bucket", type=str, location="args")
+
+def get_dashboard_counts(now_date, now_time, company_id=None):
+    """
+    Dashboard sonlari: har bir jadval uchun bitta so'rov, interaction'lar soatlik rollup'dan.
+    """
+    user_query = db.session.query(func.count(User.id)).filter(User.is_active.is_(True))
+    company_query = db.session.query(func.count(Company.id)).filter(Company.is_active.is_(True))
+    company_lid_query = db.session.query(func.count(CompanyLid.id))
+    interaction_query = db.session.query(
+        func.coalesce(func.sum(InteractionRollup.count), 0),
+        func.coalesce(func.sum(InteractionRollup.count).filter(InteractionRollup.interaction_type == "DIRECT"), 0),
+        func.coalesce(func.sum(InteractionRollup.count).filter(InteractionRollup.interaction_type == "COMMENT"), 0),
+        func.coalesce(func.sum(InteractionRollup.count).filter(InteractionRollup.hour.between(now_date, now_time)), 0)
+    )
+
+    if company_id is not None:
+        user_query = user_query.filter(User.company_id == company_id)
+        company_query = company_query.filter(Company.id == company_id)
+        company_lid_query = company_lid_query.filter(CompanyLid.company_id == company_id)
+        interaction_query = interaction_query.filter(InteractionRollup.company_id == company_id)
+
+    interaction_count, interaction_dm_count, interaction_comment_count, interaction_now_count = interaction_query.one()
+
+    return {
+        "user_count": user_query.scalar(),
+        "company_count": company_query.scalar(),
+        "company_lid_count": company_lid_query.scalar(),
+        "interaction_count": interaction_count,
+        "interaction_dm_count": interaction_dm_count,
+        "interaction_comment_count": interaction_comment_count,
+        "interaction_now_count": interaction_now_count
+    }
+
+def floor_to_bucket(value, bucket):
+    value = value.replace(second=0, microsecond=0)
+    if bucket == "minute":
+        return value
+    value = value.replace(minute=0)
+    if bucket == "hour":
+        return value
+    value = value.replace(hour=0)
+    if bucket == "day":
+        return value
+    return value - timedelta(days=value.weekday())
+
+def parse_report_range():
+    """
+    start, end, bucket query parametrlari. Vaqtlar Asia/Tashkent bo'yicha (bazadagi created_at kabi).
+    Xato bo'lsa xabar matnini qaytaradi.
+    """
+    data = report_parse.parse_args()
+    bucket = data.get("bucket") or "hour"
+    if bucket not in REPORT_BUCKETS:
+        return "Bucket must be one of minute, hour, day, week"
+
+    if data.get("start"):
+        start = parse_tashkent_datetime(data["start"])
+        if start is None:
+            return "Start is invalid"
+    else:
+        start = datetime.now(time_zone).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+
+    if data.get("end"):
+        end = parse_tashkent_datetime(data["end"])
+        if end is None:
+            return "End is invalid"
+    else:
+        end = start + timedelta(days=1)
+
+    if end <= start:
+        return "End must be after start"
+
+    if (end - start) / REPORT_BUCKETS[bucket] > MAX_REPORT_BUCKETS:
+        return f"Too many buckets, maximum is {MAX_REPORT_BUCKETS}"
+
+    return start, end, bucket
+
+def format_bucket(bucket_start, bucket_end, bucket):
+    if bucket in ("minute", "hour"):
+        return f"{bucket_start.strftime('%H:%M')} - {bucket_end.strftime('%H:%M')}"
+    return f"{bucket_start.strftime('%Y-%m-%d')} - {bucket_end.strftime('%Y-%m-%d')}"
+
+def get_interaction_histogram(start, end, bucket, company_id=None):
+    """
+    Bitta date_trunc/GROUP BY so'rovi bilan interaction'lar soni (imkon bo'lsa rollup'dan); bo'sh oraliqlar 0 bilan to'ldiriladi.
+    """
+    if bucket != "minute" and floor_to_bucket(start, "hour") == start and floor_to_bucket(end, "hour") == end:
+        bucket_column = func.date_trunc(bucket, InteractionRollup.hour).label("bucket")
+        query = db.session.query(bucket_column, func.sum(InteractionRollup.count)).filter(InteractionRollup.hour >= start, InteractionRollup.hour < end)
+        if company_id is not None:
+            query = query.filter(InteractionRollup.company_id == company_id)
+    else:
+        # Daqiqalik yoki soatga tekislanmagan oraliq - rollup yetmaydi, interaction_log'dan.
+        bucket_column = func.date_trunc(bucket, InteractionLog.created_at).label("bucket")
+        query = db.session.query(bucket_column, func.count(InteractionLog.id)).filter(InteractionLog.created_at >= start, InteractionLog.created_at < end)
+        if company_id is not None:
+            query = query.filter(InteractionLog.company_id == company_id)
+    counts = {bucket_start: count for bucket_start, count in query.group_by(bucket_column).all()}
+
+    data = []
+    bucket_start = floor_to_bucket(start, bucket)
+    while bucket_start < end:
+        bucket_end = bucket_start + REPORT_BUCKETS[bucket]
+        data.append({
+            "time": format_bucket(bucket_start, bucket_end, bucket),
+            "start": bucket_start.isoformat(),
+            "count": counts.get(bucket_start, 0)
+        })
+        bucket_start = bucket_end
+
+    return {
+        "date": start.strftime("%Y-%m-%d"),
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "bucket": bucket,
+        "data": data
+    }
 
 main_bp = Blueprint("main", __name__, url_prefix="/api/main/dashboard")
 api = Api(main_bp)
@@ -36,26 +172,10 @@ class MainResource(Resource):
         username = get_jwt_identity()
         sentry_sdk.logger.info(f"Main Dashboard get attempt for user: {username}")
 
-        user_list = User.query.filter_by(is_active=True).all()
-        company_list = Company.query.filter_by(is_active=True).all()
-        company_lid_list = CompanyLid.query.all()
-        interaction_list = InteractionLog.query.all()
-        interaction_dm_list = InteractionLog.query.filter_by(interaction_type="DIRECT").all()
-        interaction_comment_list = InteractionLog.query.filter_by(interaction_type="COMMENT").all()
-
-        now_time = datetime.now()
+        now_time = datetime.now(time_zone).replace(tzinfo=None)
         now_date = datetime(now_time.year, now_time.month, now_time.day)
-        interaction_now_list = InteractionLog.query.filter(InteractionLog.created_at.between(now_date, now_time)).all()
-
-        result = {
-            "user_count": len(user_list),
-            "company_count": len(company_list),
-            "company_lid_count": len(company_lid_list),
-            "interaction_count": len(interaction_list),
-            "interaction_dm_count": len(interaction_dm_list),
-            "interaction_comment_count": len(interaction_comment_list),
-            "interaction_now_count": len(interaction_now_list) 
-        }
+
+        result = get_dashboard_counts(now_date, now_time)
         
         sentry_sdk.logger.info(f"{username} - Main Dashboard successfully found")
         return get_response("Main Dashboard successfully found", result, 200), 200
@@ -95,26 +215,10 @@ class MainUserResource(Resource):
             sentry_sdk.logger.warning(f"Main Dashboard User failed for user: {username} - Company not found")
             return get_response("Company not found", None, 404), 404
 
-        user_list = User.query.filter_by(company_id=found_company.id, is_active=True).all()
-        company_list = Company.query.filter_by(id=found_company.id, is_active=True).all()
-        company_lid_list = CompanyLid.query.filter_by(company_id=found_company.id).all()
-        interaction_list = InteractionLog.query.filter_by(company_id=found_company.id).all()
-        interaction_dm_list = InteractionLog.query.filter_by(company_id=found_company.id, interaction_type="DIRECT").all()
-        interaction_comment_list = InteractionLog.query.filter_by(company_id=found_company.id, interaction_type="COMMENT").all()
-
-        now_time = datetime.now()
+        now_time = datetime.now(time_zone).replace(tzinfo=None)
         now_date = datetime(now_time.year, now_time.month, now_time.day)
-        interaction_now_list = InteractionLog.query.filter_by(company_id=found_company.id).filter(InteractionLog.created_at.between(now_date, now_time)).all()
-
-        result = {
-            "user_count": len(user_list),
-            "company_count": len(company_list),
-            "company_lid_count": len(company_lid_list),
-            "interaction_count": len(interaction_list),
-            "interaction_dm_count": len(interaction_dm_list),
-            "interaction_comment_count": len(interaction_comment_list),
-            "interaction_now_count": len(interaction_now_list) 
-        }
+
+        result = get_dashboard_counts(now_date, now_time, company_id=found_company.id)
         
         sentry_sdk.logger.info(f"{username} - Main Dashboard User successfully found")
         return get_response("Main Dashboard User successfully found", result, 200), 200
@@ -134,31 +238,43 @@ class MainDailyReportResource(Resource):
               type: string
               required: true
               description: Bearer token for authentication
+
+            - name: start
+              in: query
+              type: string
+              required: false
+              description: Start date or datetime, Asia/Tashkent unless an offset is given, default today 00:00
+
+            - name: end
+              in: query
+              type: string
+              required: false
+              description: End date or datetime, exclusive, Asia/Tashkent unless an offset is given, default start + 1 day
+
+            - name: bucket
+              in: query
+              type: string
+              enum: [minute, hour, day, week]
+              required: false
+              description: Bucket size, default hour
         responses:
             200:
                 description: Return a Interaction Log List
+            400:
+                description: Invalid start, end or bucket
         """
         username = get_jwt_identity()
         sentry_sdk.logger.info(f"Main Daily Report get attempt for user: {username}")
 
-        now = datetime.utcnow()
-        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-
-        result = []
-
-        for hour in range(24):
-            start_time = start_of_day + timedelta(hours=hour)
-            end_time = start_time + timedelta(hours=1)
+        report_range = parse_report_range()
+        if isinstance(report_range, str):
+            sentry_sdk.logger.warning(f"Main Daily Report failed for user: {username} - {report_range}")
+            return get_response(report_range, None, 400), 400
 
-            interaction_list = InteractionLog.query.filter(InteractionLog.created_at.between(start_time, end_time)).all()
-
-            result.append({
-                "time": f"{start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}",
-                "count": len(interaction_list)
-            })
+        result = get_interaction_histogram(*report_range)
 
         sentry_sdk.logger.info(f"{username} - Interaction Log List")
-        return get_response("Interaction Log List", {"date": start_of_day.strftime("%Y-%m-%d"), "data": result}, 200), 200
+        return get_response("Interaction Log List", result, 200), 200
 
 class MainUserDailyReportResource(Resource):
     
@@ -181,38 +297,50 @@ class MainUserDailyReportResource(Resource):
               type: integer
               required: true
               description: Enter Company ID
+
+            - name: start
+              in: query
+              type: string
+              required: false
+              description: Start date or datetime, Asia/Tashkent unless an offset is given, default today 00:00
+
+            - name: end
+              in: query
+              type: string
+              required: false
+              description: End date or datetime, exclusive, Asia/Tashkent unless an offset is given, default start + 1 day
+
+            - name: bucket
+              in: query
+              type: string
+              enum: [minute, hour, day, week]
+              required: false
+              description: Bucket size, default hour
         responses:
             200:
                 description: Return a Interaction Log List
+            400:
+                description: Invalid start, end or bucket
             404:
                 description: Company not found
         """
         username = get_jwt_identity()
         sentry_sdk.logger.info(f"Main User Daily Report get attempt for user: {username}")
 
-        now = datetime.utcnow()
-        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-
-        result = []
-
         found_company = Company.query.filter_by(id=company_id, is_active=True).first()
         if not found_company:
             sentry_sdk.logger.warning(f"Main User Daily Report failed for user: {username} - Company not found")
             return get_response("Company not found", None, 404), 404
 
-        for hour in range(24):
-            start_time = start_of_day + timedelta(hours=hour)
-            end_time = start_time + timedelta(hours=1)
-
-            interaction_list = InteractionLog.query.filter_by(company_id=found_company.id).filter(InteractionLog.created_at.between(start_time, end_time)).all()
+        report_range = parse_report_range()
+        if isinstance(report_range, str):
+            sentry_sdk.logger.warning(f"Main User Daily Report failed for user: {username} - {report_range}")
+            return get_response(report_range, None, 400), 400
 
-            result.append({
-                "time": f"{start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}",
-                "count": len(interaction_list)
-            })
+        result = get_interaction_histogram(*report_range, company_id=found_company.id)
 
         sentry_sdk.logger.info(f"{username} - Interaction Log List")
-        return get_response("Interaction Log List", {"date": start_of_day.strftime("%Y-%m-%d"), "data": result}, 200), 200
+        return get_response("Interaction Log List", result, 200), 200
 
 api.add_resource(MainResource, "/")
 api.add_resource(MainUserResource, "/user/<company_id>")
@@ -3,11 +3,12 @@ from models import db
 from flask import Blueprint
 from models.user import User
 from models.company import Company
-from utils.utils import get_response
+from utils.utils import get_response, get_page_response, paginate_query
 from flask_bcrypt import generate_password_hash
 from flask_jwt_extended import get_jwt_identity
 from flask_restful import Api, Resource, reqparse
 from utils.decorators import role_required, super_admin_required
+from utils.token_utils import bump_token_version, forget_token_version
 
 user_create_parse = reqparse.RequestParser()
 user_create_parse.add_argument("company_id", type=int, required=True, help="Company ID cannot be blank")
@@ -104,6 +105,7 @@ class UserResource(Resource):
 
         db.session.delete(user)
         db.session.commit()
+        forget_token_version(user.id)
 
         sentry_sdk.logger.info(f"{username} - User successfully deleted")
         return get_response("Successfully deleted User", None, 200), 200
@@ -179,6 +181,7 @@ class UserResource(Resource):
         if company_id is not None and user is not None:
             sentry_sdk.logger.info(f"{username} - User company id update now.")
             found_user.company_id = company_id
+            bump_token_version(found_user)
 
         if full_name is not None:
             sentry_sdk.logger.info(f"{username} - User full name update now.")
@@ -187,6 +190,7 @@ class UserResource(Resource):
         if in_username is not None:
             sentry_sdk.logger.info(f"{username} - User username update now.")
             found_user.username = in_username
+            bump_token_version(found_user)
 
         if phone_number is not None:
             sentry_sdk.logger.info(f"{username} - User phone number update now.")
@@ -195,10 +199,12 @@ class UserResource(Resource):
         if role is not None:
             sentry_sdk.logger.info(f"{username} - User role update now.")
             found_user.role = role
+            bump_token_version(found_user)
 
         if password is not None:
             sentry_sdk.logger.info(f"{username} - User password update now.")
             found_user.password = generate_password_hash(password).decode("utf-8")
+            bump_token_version(found_user)
 
         if pic_path is not None:
             sentry_sdk.logger.info(f"{username} - User pic path update now.")
@@ -207,8 +213,10 @@ class UserResource(Resource):
         if is_active is not None:
             sentry_sdk.logger.info(f"{username} - User is active update now.")
             found_user.is_active = is_active
+            bump_token_version(found_user)
 
         db.session.commit()
+        forget_token_version(found_user.id)
         sentry_sdk.logger.info(f"{username} - User successfully updated")
         return get_response("Successfully updated user", None, 200), 200
 
@@ -228,18 +236,36 @@ class UserListCreateResource(Resource):
               required: true
               description: Bearer token for authentication
 
+            - name: cursor
+              in: query
+              type: string
+              required: false
+              description: next_cursor from the previous page
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, default 50, maximum 200
+
         responses:
             200:
                 description: Return User List
+            400:
+                description: Invalid cursor or limit
         """
         username = get_jwt_identity()
         sentry_sdk.logger.info(f"User list attempt for user: {username}")
 
-        user_list = User.query.filter_by().order_by(User.created_at.desc()).all()
+        page = paginate_query(User.query.filter_by(), User)
+        if isinstance(page, str):
+            sentry_sdk.logger.warning(f"User list failed for user: {username} - {page}")
+            return get_response(page, None, 400), 400
+        user_list, next_cursor = page
         result_user_list = [user.to_dict() for user in user_list]
 
         sentry_sdk.logger.info(f"{username} - User list")
-        return get_response("User List", result_user_list, 200), 200
+        return get_page_response("User List", result_user_list, next_cursor, 200), 200
 
     @role_required(["SUPERADMIN", "ADMIN"])
     def post(self):
@@ -333,9 +359,23 @@ class UserCompanyListResource(Resource):
               required: true
               description: Enter Company ID
 
+            - name: cursor
+              in: query
+              type: string
+              required: false
+              description: next_cursor from the previous page
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, default 50, maximum 200
+
         responses:
             200:
                 description: Return User List
+            400:
+                description: Invalid cursor or limit
             404:
                 description: Company not found or not active
         """
@@ -347,11 +387,15 @@ class UserCompanyListResource(Resource):
             sentry_sdk.logger.warning(f"User user list failed for user: {username} - Company not found or not active")
             return get_response("Company not found or not active", None, 404), 404
 
-        user_list = User.query.filter_by(company_id=found_company.id).order_by(User.created_at.desc()).all()
+        page = paginate_query(User.query.filter_by(company_id=found_company.id), User)
+        if isinstance(page, str):
+            sentry_sdk.logger.warning(f"User user list failed for user: {username} - {page}")
+            return get_response(page, None, 400), 400
+        user_list, next_cursor = page
         result_user_list = [user.to_dict() for user in user_list]
 
         sentry_sdk.logger.info(f"{username} - User user list")
-        return get_response("User User List", result_user_list, 200), 200
+        return get_page_response("User User List", result_user_list, next_cursor, 200), 200
 
 api.add_resource(UserResource, "/<user_id>")
 api.add_resource(UserListCreateResource, "/")
@@ -0,0 +1,37 @@
+"""
+Snapshot tekshiruvi: SNAPSHOT_DIR dagi har bir jadval katalogini analitiklar kabi pandas bilan
+to'g'ridan-to'g'ri o'qiydi va kompaniya/kun bo'yicha qatorlar sonini chiqaradi.
+
+    SNAPSHOT_DIR=/data/snapshots python scripts/check_snapshots.py
+"""
+import os, sys
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.snapshot_service import SNAPSHOT_DIR, SNAPSHOT_TABLES
+
+def main():
+    failed = False
+    for table_name in SNAPSHOT_TABLES:
+        table_dir = os.path.join(SNAPSHOT_DIR, table_name)
+        if not os.path.isdir(table_dir):
+            print(f"{table_name}: no snapshots")
+            continue
+
+        try:
+            frame = pd.read_parquet(table_dir)
+        except Exception as e:
+            print(f"{table_name}: FAILED - {type(e).__name__}: {str(e)}")
+            failed = True
+            continue
+
+        print(f"{table_name}: {len(frame)} rows, columns - {', '.join(frame.columns)}")
+        for (company_id, snapshot_date), count in frame.groupby(["company_id", "date"], observed=True).size().items():
+            print(f"    company_id={company_id} date={snapshot_date}: {count}")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,9 @@
 import json
-import openai
 import sentry_sdk
-from models.company import Company
-from models.campaign import Campaign
-from models.ai_config import AiConfig
-from models.interaction_log import InteractionLog
+from utils.openai_config import get_openai_client
+from services.conversation_service import get_conversation_history
+from services.prompt_service import get_company_prompt, build_user_state, log_prompt_usage
+from utils.phone_utils import extract_phone_number, has_unresolved_digits, normalize_phone_number
 
 def detect_language(text):
     """
@@ -34,25 +33,7 @@ def detect_language(text):
     # Default -> Uzbek
     return "uz"
 
-def get_ai_reply(sender_id, text, company_id, have_full_name, have_phone_number):
-    sentry_sdk.logger.warning(f"Instagram webhook post get_ai_reply = text - {text}, company_id - {company_id}")
-    
-    company = Company.query.filter_by(id=company_id).first()
-    openai.api_key = company.openai_token
-
-    campaigns = Campaign.query.filter_by(company_id=company.id, is_active=True).all()
-    campaign_texts = "\n".join([
-        f"- {c.title} - \n\n{c.content}"
-        for c in campaigns
-    ])
-
-    ai_configs = AiConfig.query.filter_by(company_id=company.id).all()
-    ai_templates = "\n".join([
-        f"- [{cfg.template_name}]: {cfg.template_text}"
-        for cfg in ai_configs
-        if cfg.use_openai is True
-    ])
-
+def _build_reply_messages(sender_id, text, company_prompt, have_full_name, have_phone_number):
     user_lang = detect_language(text)
 
     if user_lang == "uz":
@@ -62,78 +43,58 @@ def get_ai_reply(sender_id, text, company_id, have_full_name, have_phone_number)
     else:
         language_instruction = "Reply only in casual, conversational English."
 
-    system_prompt = f"""
-You are a real Instagram manager (22–28 years old).
-You chat like a normal human, not a chatbot.
-
-COMPANY DATA:
-{campaign_texts}
-
-AI CONFIG:
-{ai_templates}
-
-CONVERSATION FLOW (VERY IMPORTANT):
-- NEVER give all information at once.
-- Answer ONLY what the user asked.
-- If the user asks generally (example: "online kurs bormi"):
-  → confirm shortly and ask what exactly they want (price, duration, format).
-- Give information step by step like a real human.
-- After answering, ask a follow-up question ONLY if it helps move the user closer to registration.
-- Otherwise, end the message without a question.
-- If the user asks for price, duration, or registration:
-    → provide the info and THEN ask for name and phone (if not known yet).
-- If the user shows interest (asks about price, duration, registration) and you don't have their name or phone:
-    → ask for the missing info (name or phone) according to the LEAD RULE below
-    → ONLY ONCE per missing info.
-
-LEAD RULE:
-- Ask for name and phone ONLY ONCE.
-- Ask them only after the user shows interest (price, duration, registration).
-- When asking name or phone, add:
-  "Operatorlarimiz siz bilan bog‘lanib, kurs haqida batafsil ma’lumot beradi."
-- Do NOT add this sentence anywhere else.
-
-STYLE RULES:
-- Short messages
-- No emojis
-- No lists unless necessary
-- Friendly, positive, energetic tone
-- Uzbek → casual Uzbek latin
-- Never sound like a bot
-
-Language rule:
-{language_instruction}
-
-USER DATA:
-- Full name known: {have_full_name}
-- Phone number known: {have_phone_number}
-
-STRICT RULES:
-- Do NOT repeat greetings
-- Do NOT repeat previous answers
-- Do NOT dump all data
-- If info not available: "Bu savol kompaniya materiallarida mavjud emas."
-- If asked for discounts/promotions: "Ayni paytda kompaniyada maxsus aksiyalar mavjud emas."
-- If asked for competitors: "Kechirasiz, bu haqda ma’lumot bera olmayman."
-""" 
-    messages = [
-        {"role": "system", "content": system_prompt}
-    ]
+    # Cache'lanadigan qism: prefiks + suhbat tarixi. Lid holati va til har xabarda o'zgarishi mumkin - tarixdan keyin.
+    messages = [{"role": "system", "content": company_prompt["prefix"]}]
 
-    interaction_log_list = InteractionLog.query.filter_by(company_id=company.id, user_instagram_id=sender_id).order_by(InteractionLog.created_at.desc()).limit(12).all()
-    for log in reversed(interaction_log_list):
-        messages.append({"role": "user", "content": log.message})
-        messages.append({"role": "assistant", "content": log.ai_response})
+    history = get_conversation_history(company_prompt["company_id"], sender_id)
+    for item in reversed(history):
+        messages.append({"role": "user", "content": item["message"]})
+        messages.append({"role": "assistant", "content": item["ai_response"]})
 
-    messages.append({"role": "user", "content": text})
+    messages.append({"role": "system", "content": build_user_state(have_full_name, have_phone_number, language_instruction)})
 
     if len(text.split()) <= 2:
-        messages.insert(1, {
+        messages.append({
             "role": "system",
             "content": "User message is very short. Reply briefly. Do NOT ask a question unless absolutely necessary."
         })
 
-    response = openai.chat.completions.create(
+    messages.append({"role": "user", "content": text})
+    return messages, history
+
+def _is_repeated_reply(reply, history):
+    if len(history) <= 3:
+        return False
+
+    last_ai = [item["ai_response"].lower().strip() for item in history[:3]]
+    return reply.lower().strip() in last_ai
+
+def _rewrite_reply(company_prompt, messages):
+    messages.insert(len(messages) - 1, {
+        "role": "system",
+        "content": "Rewrite your answer in a completely different way."
+    })
+    client = get_openai_client(company_prompt["company_id"], company_prompt["openai_token"])
+    response = client.chat.completions.create(
+        model="gpt-4.1-mini",
+        temperature=0.6,
+        max_tokens=80,
+        presence_penalty=0.7,
+        frequency_penalty=0.7,
+        messages=messages
+    )
+    log_prompt_usage("rewrite_reply", company_prompt, response)
+    return response.choices[0].message.content
+
+def get_ai_reply(sender_id, text, company_id, have_full_name, have_phone_number):
+    sentry_sdk.logger.warning(f"Instagram webhook post get_ai_reply = text - {text}, company_id - {company_id}")
+    
+    company_prompt = get_company_prompt(company_id)
+    client = get_openai_client(company_id, company_prompt["openai_token"])
+
+    messages, history = _build_reply_messages(sender_id, text, company_prompt, have_full_name, have_phone_number)
+
+    response = client.chat.completions.create(
         model="gpt-4.1-mini",
         temperature=0.6,
         max_tokens=80,
@@ -141,34 +102,96 @@ STRICT RULES:
         frequency_penalty=0.5,
         messages=messages
     )
+    log_prompt_usage("get_ai_reply", company_prompt, response)
 
     reply = response.choices[0].message.content
-    if len(interaction_log_list) > 3:
-        last_ai = [log.ai_response.lower().strip() for log in interaction_log_list[:3]]
-
-        if reply.lower().strip() in last_ai:
-            messages.insert(1, {
-                "role": "system",
-                "content": "Rewrite your answer in a completely different way."
-            })
-            response = openai.chat.completions.create(
-                model="gpt-4.1-mini",
-                temperature=0.6,
-                max_tokens=80,
-                presence_penalty=0.7,
-                frequency_penalty=0.7,
-                messages=messages
-            )
-            reply = response.choices[0].message.content
+    if _is_repeated_reply(reply, history):
+        reply = _rewrite_reply(company_prompt, messages)
         
     sentry_sdk.logger.warning(f"Instagram webhook post get_ai_reply = response - {reply}")
     return reply
 
+def get_ai_lead_reply(sender_id, text, company_id, have_full_name, have_phone_number):
+    """
+    Bitta so'rovda ism, telefon raqam va javobni birga olish.
+    Javob kesilgan yoki JSON noto'g'ri bo'lsa None - chaqiruvchi alohida so'rovlarga o'tadi.
+    """
+    sentry_sdk.logger.warning(f"Instagram webhook post get_ai_lead_reply = text - {text}, company_id - {company_id}")
+
+    company_prompt = get_company_prompt(company_id)
+    client = get_openai_client(company_id, company_prompt["openai_token"])
+
+    messages, history = _build_reply_messages(sender_id, text, company_prompt, have_full_name, have_phone_number)
+    messages.append({
+        "role": "system",
+        "content": """
+Also extract lead data from the LAST user message only.
+- name: the user's name or full name if they wrote it, otherwise null.
+- phone: the user's phone number if they wrote it, otherwise null.
+- reply: your answer to the user, following all rules above.
+If the last message gives the missing name or phone, treat it as known in your reply.
+"""
+    })
+
+    response = client.chat.completions.create(
+        model="gpt-4.1-mini",
+        temperature=0.6,
+        max_tokens=160,
+        presence_penalty=0.3,
+        frequency_penalty=0.5,
+        response_format={
+            "type": "json_schema",
+            "json_schema": {
+                "name": "lead_reply",
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": ["string", "null"]},
+                        "phone": {"type": ["string", "null"]},
+                        "reply": {"type": "string"}
+                    },
+                    "required": ["name", "phone", "reply"]
+                }
+            }
+        },
+        messages=messages
+    )
+    log_prompt_usage("get_ai_lead_reply", company_prompt, response)
+    choice = response.choices[0]
+    if choice.finish_reason == "length":
+        sentry_sdk.logger.warning(f"Instagram webhook post get_ai_lead_reply - response truncated by max_tokens, falling back")
+        return None
+
+    try:
+        data = json.loads(choice.message.content)
+    except (json.JSONDecodeError, TypeError) as e:
+        sentry_sdk.logger.warning(f"Instagram webhook post get_ai_lead_reply - invalid JSON, falling back - {str(e)}")
+        return None
+    if not isinstance(data, dict) or not data.get("reply"):
+        sentry_sdk.logger.warning(f"Instagram webhook post get_ai_lead_reply - reply missing, falling back")
+        return None
+
+    reply = data["reply"]
+    if _is_repeated_reply(reply, history):
+        messages.pop()
+        reply = _rewrite_reply(company_prompt, messages)
+
+    phone_number = extract_phone_number(text)
+    if not phone_number and data.get("phone") and has_unresolved_digits(text):
+        phone_number = normalize_phone_number(data["phone"]) or data["phone"]
+
+    result = {
+        "name": data["name"] if data.get("name") else "no",
+        "phone": phone_number if phone_number else "no",
+        "reply": reply
+    }
+    sentry_sdk.logger.warning(f"Instagram webhook post get_ai_lead_reply = response - {str(result)}")
+    return result
+
 def get_full_name(text, company_id):
     sentry_sdk.logger.warning(f"Instagram webhook post get_full_name = text - {text}, company_id - {company_id}")
     
-    company = Company.query.filter_by(id=company_id).first()
-    openai.api_key = company.openai_token
+    client = get_openai_client(company_id, get_company_prompt(company_id)["openai_token"])
 
     system_prompt = """
 Sen faqat JSON qaytaradigan analizchisiz.
@@ -178,7 +201,7 @@ Agar yo‘q bo‘lsa — name maydoni null bo‘lsin.
 Hech qachon izoh, tushuntirish yoki boshqa gap yozma.
 """
 
-    response = openai.chat.completions.create(
+    response = client.chat.completions.create(
         model="gpt-4.1-mini",
         response_format={
             "type": "json_schema",
@@ -206,9 +229,16 @@ Hech qachon izoh, tushuntirish yoki boshqa gap yozma.
 
 def get_phone_number(text, company_id):
     sentry_sdk.logger.warning(f"Instagram webhook post get_phone_number = text - {text}, company_id - {company_id}")
+
+    phone_number = extract_phone_number(text)
+    if phone_number:
+        sentry_sdk.logger.warning(f"Instagram webhook post get_phone_number = local response - {phone_number}")
+        return phone_number
+
+    if not has_unresolved_digits(text):
+        return "no"
     
-    company = Company.query.filter_by(id=company_id).first()
-    openai.api_key = company.openai_token
+    client = get_openai_client(company_id, get_company_prompt(company_id)["openai_token"])
 
     system_prompt = """
 Sen faqat JSON qaytaradigan analizchisiz.
@@ -218,7 +248,7 @@ Agar yo‘q bo‘lsa — phone maydoni null bo‘lsin.
 Qo‘shimcha gap yozma.
 """
 
-    response = openai.chat.completions.create(
+    response = client.chat.completions.create(
         model="gpt-4.1-mini",
         response_format={
             "type": "json_schema",
@@ -242,4 +272,6 @@ Qo‘shimcha gap yozma.
     data = json.loads(raw_json)
     
     sentry_sdk.logger.warning(f"Instagram webhook post get_phone_number = response - {str(data)}")
-    return data["phone"] if data["phone"] else "no"
+    if not data["phone"]:
+        return "no"
+    return normalize_phone_number(data["phone"]) or data["phone"]
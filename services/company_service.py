@@ -0,0 +1,221 @@
+import os, uuid
+import redis
+import sentry_sdk
+from models import db
+from datetime import datetime
+from sqlalchemy import select
+from celery import shared_task
+from models.user import User
+from models.company import Company
+from models.campaign import Campaign
+from models.ai_config import AiConfig
+from models.company_lid import CompanyLid
+from models.interaction_log import InteractionLog
+from models.interaction_rollup import InteractionRollup
+from utils.token_utils import forget_token_version
+from services.intent_service import intent_cache
+from services.reply_cache_service import reply_index_cache
+from services.prompt_service import prompt_cache, bump_prompt_version
+from services.snapshot_service import delete_company_snapshots
+from utils.cache_utils import LocalCache, publish_invalidation
+from utils.redis_client_config import get_redis_client
+
+INSTAGRAM_COMPANY_CACHE_NAME = "instagram_company"
+INSTAGRAM_COMPANY_LOCAL_TTL = int(os.getenv("INSTAGRAM_COMPANY_LOCAL_TTL", 60))
+INSTAGRAM_COMPANY_REDIS_TTL = int(os.getenv("INSTAGRAM_COMPANY_REDIS_TTL", 3600))
+COMPANY_DELETE_CHUNK_SIZE = int(os.getenv("COMPANY_DELETE_CHUNK_SIZE", 5000))
+COMPANY_DELETE_JOB_TTL = int(os.getenv("COMPANY_DELETE_JOB_TTL", 604800))
+
+COMPANY_REDIS_SCAN_COUNT = int(os.getenv("COMPANY_REDIS_SCAN_COUNT", 1000))
+
+# Kompaniyaga tegishli Redis kalitlari (suhbat tarixi, username, reply cache, burst buferi, prompt versiyasi).
+COMPANY_REDIS_KEY_PATTERNS = [
+    "ai_history:{company_id}:*",
+    "ig_username:{company_id}:*",
+    "ai_reply_cache:{company_id}:*",
+    "ig_burst:{company_id}:*",
+    "ig_burst_last:{company_id}:*",
+    "ig_burst_scheduled:{company_id}:*",
+    "ai_prompt_version:{company_id}"
+]
+
+# Eng katta jadvallar birinchi; kompaniya yozuvi oxirida o'chiriladi.
+COMPANY_DELETE_MODELS = [InteractionLog, InteractionRollup, CompanyLid, Campaign, AiConfig, User]
+
+instagram_company_cache = LocalCache(INSTAGRAM_COMPANY_CACHE_NAME, INSTAGRAM_COMPANY_LOCAL_TTL)
+
+def resolve_instagram_companies(instagram_ids):
+    """
+    instagram_id -> faol company_id: avval worker cache, keyin Redis, oxirida bitta DB so'rovi.
+    """
+    result = {}
+    missing_ids = []
+    for instagram_id in instagram_ids:
+        company_id = instagram_company_cache.get(instagram_id)
+        if company_id is None:
+            missing_ids.append(instagram_id)
+        else:
+            result[instagram_id] = company_id
+
+    if not missing_ids:
+        return result
+
+    try:
+        cached_values = get_redis_client().mget([f"ig_company:{instagram_id}" for instagram_id in missing_ids])
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Instagram company cache get error - {str(e)}")
+        cached_values = [None] * len(missing_ids)
+
+    db_ids = []
+    for instagram_id, company_id in zip(missing_ids, cached_values):
+        if company_id is None:
+            db_ids.append(instagram_id)
+            continue
+        result[instagram_id] = int(company_id)
+        instagram_company_cache.set(instagram_id, int(company_id))
+
+    if not db_ids:
+        return result
+
+    company_list = Company.query.filter(Company.instagram_id.in_(db_ids), Company.is_active.is_(True)).all()
+    try:
+        pipeline = get_redis_client().pipeline(transaction=False)
+        for company in company_list:
+            pipeline.set(f"ig_company:{company.instagram_id}", company.id, ex=INSTAGRAM_COMPANY_REDIS_TTL)
+        pipeline.execute()
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Instagram company cache set error - {str(e)}")
+
+    for company in company_list:
+        result[company.instagram_id] = company.id
+        instagram_company_cache.set(company.instagram_id, company.id)
+    return result
+
+def invalidate_instagram_company(*instagram_ids):
+    for instagram_id in set(instagram_ids):
+        if not instagram_id:
+            continue
+
+        try:
+            get_redis_client().delete(f"ig_company:{instagram_id}")
+        except redis.RedisError as e:
+            sentry_sdk.logger.error(f"Instagram company cache delete error - {str(e)}")
+        publish_invalidation(INSTAGRAM_COMPANY_CACHE_NAME, instagram_id)
+
+def delete_company_redis_state(company_id):
+    """
+    O'chirilgan kompaniyaning Redis kalitlarini SCAN bilan topib o'chiradi va worker cache'larini tozalaydi.
+    """
+    redis_client = get_redis_client()
+    deleted_count = 0
+    for pattern in COMPANY_REDIS_KEY_PATTERNS:
+        keys = []
+        for key in redis_client.scan_iter(match=pattern.format(company_id=company_id), count=COMPANY_REDIS_SCAN_COUNT):
+            keys.append(key)
+            if len(keys) >= COMPANY_REDIS_SCAN_COUNT:
+                deleted_count += redis_client.unlink(*keys)
+                keys = []
+        if keys:
+            deleted_count += redis_client.unlink(*keys)
+
+    # instagram_id o'zgargan bo'lsa, eski id'lar ham shu kompaniyaga ko'rsatib turgan bo'lishi mumkin.
+    instagram_ids = []
+    for key in redis_client.scan_iter(match="ig_company:*", count=COMPANY_REDIS_SCAN_COUNT):
+        value = redis_client.get(key)
+        if value is not None and int(value) == company_id:
+            instagram_ids.append(key.decode("utf-8").split(":", 1)[1])
+    invalidate_instagram_company(*instagram_ids)
+
+    publish_invalidation(prompt_cache.name, company_id)
+    publish_invalidation(intent_cache.name, company_id)
+    publish_invalidation(reply_index_cache.name)
+    return deleted_count + len(instagram_ids)
+
+def get_company_delete_job_key(job_id):
+    return f"company_delete_job:{job_id}"
+
+def update_company_delete_job(job_id, **fields):
+    try:
+        pipeline = get_redis_client().pipeline()
+        pipeline.hset(get_company_delete_job_key(job_id), mapping={key: str(value) for key, value in fields.items()})
+        pipeline.expire(get_company_delete_job_key(job_id), COMPANY_DELETE_JOB_TTL)
+        pipeline.execute()
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Company delete job update error - {str(e)}")
+
+def get_company_delete_job(job_id):
+    job = get_redis_client().hgetall(get_company_delete_job_key(job_id))
+    return {key.decode("utf-8"): value.decode("utf-8") for key, value in job.items()}
+
+def start_company_delete(company):
+    """
+    Kompaniyani darhol nofaol qiladi (webhook to'xtaydi) va ma'lumotlarini o'chirish task'ini navbatga qo'yadi.
+    Shu kompaniya uchun job allaqachon bo'lsa, o'sha job_id qaytariladi.
+    """
+    job_id = uuid.uuid4().hex
+    if not get_redis_client().set(f"company_delete:{company.id}", job_id, nx=True, ex=COMPANY_DELETE_JOB_TTL):
+        return get_redis_client().get(f"company_delete:{company.id}").decode("utf-8")
+
+    # Kompaniya foydalanuvchilarining token'lari ham darhol bekor qilinadi.
+    user_id_list = [user_id for (user_id,) in db.session.query(User.id).filter(User.company_id == company.id).all()]
+    User.query.filter(User.company_id == company.id).update(
+        {User.is_active: False, User.token_version: User.token_version + 1},
+        synchronize_session=False
+    )
+    company.is_active = False
+    db.session.commit()
+    forget_token_version(*user_id_list)
+    invalidate_instagram_company(company.instagram_id)
+    bump_prompt_version(company.id)
+
+    update_company_delete_job(job_id, status="queued", company_id=company.id, created_at=datetime.now().isoformat())
+    try:
+        delete_company_data.delay(company.id, job_id)
+    except Exception:
+        # Navbatga qo'yilmadi - qayta urinish mumkin bo'lsin (kompaniya nofaol qoladi).
+        update_company_delete_job(job_id, status="failed", error="Task could not be queued")
+        get_redis_client().delete(f"company_delete:{company.id}")
+        raise
+    return job_id
+
+def delete_in_chunks(model, company_id, job_id):
+    """
+    Set-based DELETE ... WHERE id IN (... LIMIT n) - har bir bo'lak alohida tranzaksiyada, qulflar qisqa.
+    """
+    table_name = model.__tablename__
+    deleted_count = 0
+    while True:
+        id_select = select(model.id).where(model.company_id == company_id).limit(COMPANY_DELETE_CHUNK_SIZE)
+        chunk_count = model.query.filter(model.id.in_(id_select)).delete(synchronize_session=False)
+        db.session.commit()
+
+        deleted_count += chunk_count
+        update_company_delete_job(job_id, **{"table": table_name, f"deleted:{table_name}": deleted_count})
+        if chunk_count < COMPANY_DELETE_CHUNK_SIZE:
+            return deleted_count
+
+@shared_task(name="services.company_service.delete_company_data")
+def delete_company_data(company_id, job_id):
+    update_company_delete_job(job_id, status="running", started_at=datetime.now().isoformat())
+    try:
+        for model in COMPANY_DELETE_MODELS:
+            deleted_count = delete_in_chunks(model, company_id, job_id)
+            sentry_sdk.logger.info(f"Company delete job {job_id} - {model.__tablename__} deleted {deleted_count}")
+
+        Company.query.filter_by(id=company_id).delete(synchronize_session=False)
+        db.session.commit()
+        delete_company_snapshots(company_id)
+        deleted_count = delete_company_redis_state(company_id)
+        update_company_delete_job(job_id, **{"deleted:redis": deleted_count})
+    except Exception as e:
+        db.session.rollback()
+        update_company_delete_job(job_id, status="failed", error=str(e), finished_at=datetime.now().isoformat())
+        sentry_sdk.logger.error(f"Company delete job {job_id} failed - company_id - {company_id} - {str(e)}")
+        try:
+            get_redis_client().delete(f"company_delete:{company_id}")
+        except redis.RedisError:
+            pass
+        raise
+
+    update_company_delete_job(job_id, status="done", finished_at=datetime.now().isoformat())
+    sentry_sdk.logger.info(f"Company delete job {job_id} done - company_id - {company_id}")
@@ -0,0 +1,56 @@
+import os, json
+import redis
+import sentry_sdk
+from models.interaction_log import InteractionLog
+from utils.redis_client_config import get_redis_client
+
+AI_HISTORY_LIMIT = int(os.getenv("AI_HISTORY_LIMIT", 12))
+AI_HISTORY_TTL = int(os.getenv("AI_HISTORY_TTL", 86400))
+
+def get_history_key(company_id, sender_id):
+    return f"ai_history:{company_id}:{sender_id}"
+
+def get_conversation_history(company_id, sender_id):
+    """
+    Suhbatning oxirgi xabarlari (eng yangisi birinchi). Avval Redis, bo'lmasa DB'dan qayta quriladi.
+    """
+    key = get_history_key(company_id, sender_id)
+    try:
+        items = get_redis_client().lrange(key, 0, AI_HISTORY_LIMIT - 1)
+        if items:
+            return [json.loads(item) for item in items]
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Conversation history get error - {str(e)}")
+
+    interaction_log_list = InteractionLog.query.filter_by(company_id=company_id, user_instagram_id=sender_id).order_by(InteractionLog.created_at.desc()).limit(AI_HISTORY_LIMIT).all()
+    history = [{"message": log.message, "ai_response": log.ai_response} for log in interaction_log_list]
+    if not history:
+        return history
+
+    try:
+        pipeline = get_redis_client().pipeline()
+        pipeline.delete(key)
+        pipeline.rpush(key, *[json.dumps(item) for item in history])
+        pipeline.expire(key, AI_HISTORY_TTL)
+        pipeline.execute()
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Conversation history rebuild error - {str(e)}")
+    return history
+
+def append_conversation_history(company_id, sender_id, message, ai_response):
+    # LPUSHX: cache yo'q bo'lsa to'liq bo'lmagan ro'yxat yaratmaymiz, keyingi o'qishda DB'dan quriladi.
+    key = get_history_key(company_id, sender_id)
+    try:
+        pipeline = get_redis_client().pipeline()
+        pipeline.lpushx(key, json.dumps({"message": message, "ai_response": ai_response}))
+        pipeline.ltrim(key, 0, AI_HISTORY_LIMIT - 1)
+        pipeline.expire(key, AI_HISTORY_TTL)
+        pipeline.execute()
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Conversation history append error - {str(e)}")
+
+def clear_conversation_history(company_id, sender_id):
+    try:
+        get_redis_client().delete(get_history_key(company_id, sender_id))
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Conversation history clear error - {str(e)}")
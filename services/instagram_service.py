@@ -1,18 +1,50 @@
+import os, json, time
+import redis
 import sentry_sdk
-import os, requests
 from models import db
+from flask import current_app
 from celery import shared_task
+from redis.exceptions import LockError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from concurrent.futures import ThreadPoolExecutor
 from models.company import Company
 from models.company_lid import CompanyLid
+from utils.utils import get_env_bool
+from utils.phone_utils import extract_phone_number, has_unresolved_digits
+from utils.graph_api_client import graph_request
+from utils.redis_client_config import get_redis_client
 from models.interaction_log import InteractionLog
-from services.ai_service import get_ai_reply, get_full_name, get_phone_number
+from services.intent_service import match_canned_reply
+from services.reply_cache_service import is_cacheable_question, get_cached_reply, set_cached_reply
+from services.report_service import add_interaction_rollup
+from services.conversation_service import get_conversation_history, append_conversation_history
+from services.ai_service import get_ai_reply, get_ai_lead_reply, get_full_name, get_phone_number
 
-URL = os.getenv("IG_API_URL")
+AI_COMBINED_MODE = get_env_bool("AI_COMBINED_MODE", True)
+AI_CANNED_REPLY = get_env_bool("AI_CANNED_REPLY", True)
+AI_REPLY_CACHE = get_env_bool("AI_REPLY_CACHE", True)
+# Spekulyativ javob kechikishni kamaytiradi, lekin extraction flag'larni o'zgartirsa javob tashlanadi:
+# boshlangan OpenAI so'rovini to'xtatib bo'lmaydi, shuning uchun bunday xabar 2-3 ta reply chaqiruviga tushadi
+# (spekulyativ + qayta yozish + yangi javob). Xarajat muhim bo'lsa yoqilmaydi.
+AI_SPECULATIVE_REPLY = get_env_bool("AI_SPECULATIVE_REPLY", False)
+IG_USERNAME_TTL = int(os.getenv("IG_USERNAME_TTL", 86400))
+IG_DEBOUNCE_SECONDS = float(os.getenv("IG_DEBOUNCE_SECONDS", 3))
+IG_CONVERSATION_LOCK_LEASE = int(os.getenv("IG_CONVERSATION_LOCK_LEASE", 120))
+IG_CONVERSATION_LOCK_WAIT = float(os.getenv("IG_CONVERSATION_LOCK_WAIT", 5))
+IG_CONVERSATION_LOCK_RETRY_SECONDS = int(os.getenv("IG_CONVERSATION_LOCK_RETRY_SECONDS", 2))
+IG_CONVERSATION_LOCK_MAX_RETRIES = int(os.getenv("IG_CONVERSATION_LOCK_MAX_RETRIES", 60))
+# Burst kalitlari flush_dm_burst lock kutib turgan butun vaqt davomida saqlanishi kerak.
+IG_BURST_TTL = int(
+    IG_CONVERSATION_LOCK_LEASE
+    + IG_CONVERSATION_LOCK_MAX_RETRIES * (IG_CONVERSATION_LOCK_RETRY_SECONDS + IG_CONVERSATION_LOCK_WAIT)
+    + IG_DEBOUNCE_SECONDS * 10 + 60
+)
+AI_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("AI_EXECUTOR_WORKERS", 8)), thread_name_prefix="process_dm")
 
 @shared_task
 def send_dm_reply(sender_id, message, company_id):
     company = Company.query.filter_by(id=company_id).first()
-    url = f"{URL}/me/messages?access_token={company.instagram_token}"
 
     sentry_sdk.logger.warning(f"Instagram webhook post send_dm_reply = sender_id - {sender_id}, company_id - {company_id}, message - {message}")
     payload = {
@@ -21,55 +53,304 @@ def send_dm_reply(sender_id, message, company_id):
         "message": {"text": message},
     }
 
-    requests.post(url, json=payload)
+    response = graph_request("POST", "/me/messages", params={"access_token": company.instagram_token}, json=payload)
+    if not response.ok:
+        sentry_sdk.logger.error(f"Instagram webhook post send_dm_reply failed - status {response.status_code}, {response.text}")
+        return
     sentry_sdk.logger.warning(f"Instagram webhook post send_dm_reply successfully sended")
 
+def get_cached_dm_username(sender_id, company_id):
+    try:
+        username = get_redis_client().get(f"ig_username:{company_id}:{sender_id}")
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Instagram webhook post get_cached_dm_username error - {str(e)}")
+        return None
+    return username.decode("utf-8") if username else None
+
 def get_dm_username(sender_id, company_id):
     company = Company.query.filter_by(id=company_id).first()
-    url = f"{URL}/{sender_id}?fields=username&access_token={company.instagram_token}"
 
-    sentry_sdk.logger.warning(f"Instagram webhook post get_dm_username = sender_id - {sender_id}, company_id - {company_id}, token - {company.instagram_token}")
-    result = requests.get(url).json()
+    sentry_sdk.logger.warning(f"Instagram webhook post get_dm_username = sender_id - {sender_id}, company_id - {company_id}")
+    result = graph_request("GET", f"/{sender_id}", params={"fields": "username", "access_token": company.instagram_token}).json()
+
+    try:
+        get_redis_client().set(f"ig_username:{company_id}:{sender_id}", result["username"], ex=IG_USERNAME_TTL)
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Instagram webhook post get_dm_username cache error - {str(e)}")
 
     sentry_sdk.logger.warning(f"Instagram webhook post get_dm_username = username - {result['username']}")
     return result["username"]
 
-@shared_task(name="services.instagram_service.process_dm")
-def process_dm(message, sender_id, company_id):
+def resolve_dm_username(username_future, found_company_lid):
+    try:
+        return username_future.result()
+    except Exception as e:
+        # Graph API ishlamasa, ma'lum lid uchun saqlangan username yetarli.
+        if found_company_lid is None:
+            raise
+        sentry_sdk.logger.error(f"Instagram webhook post get_dm_username failed, using stored username - {str(e)}")
+        return found_company_lid.username
+
+def get_burst_keys(company_id, sender_id):
+    return (
+        f"ig_burst:{company_id}:{sender_id}",
+        f"ig_burst_last:{company_id}:{sender_id}",
+        f"ig_burst_scheduled:{company_id}:{sender_id}"
+    )
+
+def buffer_dm_events(events):
+    """
+    Bir yozuvchidan ketma-ket kelgan xabarlarni debounce oynasida yig'ish.
+    events - (message, sender_id, company_id, mid) ro'yxati; navbatga qo'yiladigan task signature'larini qaytaradi.
+    """
+    if IG_DEBOUNCE_SECONDS <= 0:
+        return [process_dm.s(message, sender_id, company_id, mid) for message, sender_id, company_id, mid in events]
+
+    now = time.time()
+    try:
+        pipeline = get_redis_client().pipeline()
+        for message, sender_id, company_id, mid in events:
+            burst_key, last_key, scheduled_key = get_burst_keys(company_id, sender_id)
+            pipeline.rpush(burst_key, json.dumps({"message": message, "mid": mid}))
+            pipeline.expire(burst_key, IG_BURST_TTL)
+            pipeline.set(last_key, now, ex=IG_BURST_TTL)
+            pipeline.set(scheduled_key, 1, nx=True, ex=IG_BURST_TTL)
+        results = pipeline.execute()
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Instagram webhook burst buffer error - {str(e)}")
+        return [process_dm.s(message, sender_id, company_id, mid) for message, sender_id, company_id, mid in events]
+
+    # Har bir xabar uchun 4 ta buyruq; oxirgisi (SET NX) oynadagi birinchi xabarni bildiradi.
+    tasks = []
+    for index, (message, sender_id, company_id, mid) in enumerate(events):
+        if results[index * 4 + 3]:
+            tasks.append(flush_dm_burst.signature((company_id, sender_id), countdown=IG_DEBOUNCE_SECONDS))
+    return tasks
+
+@shared_task(bind=True, name="services.instagram_service.flush_dm_burst", max_retries=IG_CONVERSATION_LOCK_MAX_RETRIES)
+def flush_dm_burst(self, company_id, sender_id):
+    redis_client = get_redis_client()
+    burst_key, last_key, scheduled_key = get_burst_keys(company_id, sender_id)
+
+    last_message_at = redis_client.get(last_key)
+    if last_message_at is not None:
+        remaining = float(last_message_at) + IG_DEBOUNCE_SECONDS - time.time()
+        if remaining > 0:
+            flush_dm_burst.apply_async((company_id, sender_id), countdown=remaining)
+            return
+
+    lock = acquire_conversation_lock(company_id, sender_id)
+    if lock is False:
+        # Kutish davomida xabarlar yo'qolmasligi uchun burst kalitlari muddati uzaytiriladi.
+        try:
+            pipeline = redis_client.pipeline()
+            for key in (burst_key, last_key, scheduled_key):
+                pipeline.expire(key, IG_BURST_TTL)
+            pipeline.execute()
+        except redis.RedisError as e:
+            sentry_sdk.logger.error(f"Instagram webhook post flush_dm_burst expire error - {str(e)}")
+        raise self.retry(countdown=IG_CONVERSATION_LOCK_RETRY_SECONDS)
+
+    try:
+        pipeline = redis_client.pipeline()
+        pipeline.lrange(burst_key, 0, -1)
+        pipeline.delete(burst_key, last_key, scheduled_key)
+        burst_items, _ = pipeline.execute()
+        if not burst_items:
+            return
+
+        burst = [json.loads(item) for item in burst_items]
+        message = "\n".join(item["message"] for item in burst)
+        sentry_sdk.logger.warning(f"Instagram webhook post flush_dm_burst - {len(burst)} messages merged, sender_id - {sender_id}, company_id - {company_id}")
+        handle_dm(message, sender_id, company_id, burst[-1]["mid"])
+    finally:
+        release_conversation_lock(lock)
+
+def acquire_conversation_lock(company_id, sender_id):
+    """
+    Bitta suhbat (company_id, sender_id) uchun task'larni ketma-ket bajarish.
+    Lock olinmasa False; Redis ishlamasa None (lock'siz davom etiladi).
+    """
+    lock = get_redis_client().lock(
+        f"ig_conversation_lock:{company_id}:{sender_id}",
+        timeout=IG_CONVERSATION_LOCK_LEASE,
+        blocking_timeout=IG_CONVERSATION_LOCK_WAIT
+    )
+    try:
+        if not lock.acquire():
+            return False
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Instagram webhook post conversation lock error - {str(e)}")
+        return None
+    return lock
+
+def release_conversation_lock(lock):
+    if not lock:
+        return
+
+    try:
+        lock.release()
+    except (LockError, redis.RedisError) as e:
+        sentry_sdk.logger.warning(f"Instagram webhook post conversation lock release error - {str(e)}")
+
+def upsert_company_lid(company_id, sender_id, username):
+    insert_statement = pg_insert(CompanyLid.__table__).values(
+        company_id=company_id,
+        user_instagram_id=sender_id,
+        username=username,
+        status="NEW"
+    ).on_conflict_do_nothing(index_elements=["company_id", "user_instagram_id"])
+    db.session.execute(insert_statement)
+    return CompanyLid.query.filter_by(company_id=company_id, user_instagram_id=sender_id).first()
+
+def submit_in_app_context(func, *args):
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            return func(*args)
+
+    return AI_EXECUTOR.submit(run)
+
+@shared_task(bind=True, name="services.instagram_service.process_dm", max_retries=IG_CONVERSATION_LOCK_MAX_RETRIES)
+def process_dm(self, message, sender_id, company_id, mid=None):
+    lock = acquire_conversation_lock(company_id, sender_id)
+    if lock is False:
+        raise self.retry(countdown=IG_CONVERSATION_LOCK_RETRY_SECONDS)
+
+    try:
+        handle_dm(message, sender_id, company_id, mid)
+    finally:
+        release_conversation_lock(lock)
+
+def is_company_active(company_id, lock=False):
+    """
+    lock=True - kompaniya qatoriga FOR SHARE qulfi: o'chirish boshlanishi shu tranzaksiya tugashini kutadi.
+    """
+    query = db.session.query(Company.is_active).filter(Company.id == company_id)
+    if lock:
+        query = query.with_for_update(read=True)
+    return bool(query.scalar())
+
+def handle_dm(message, sender_id, company_id, mid=None):
     print(message)
-    user_username = get_dm_username(sender_id, company_id)
+    if not is_company_active(company_id):
+        sentry_sdk.logger.warning(f"Instagram webhook post process_dm - company {company_id} not active, skipped")
+        return
 
-    found_company_lid = CompanyLid.query.filter_by(company_id=company_id, user_instagram_id=sender_id, username=user_username).first()
-    if not found_company_lid:
-        found_company_lid = CompanyLid(company_id, sender_id, user_username, "NEW")
-        db.session.add(found_company_lid)
+    if mid is not None and InteractionLog.query.filter_by(mid=mid).first():
+        sentry_sdk.logger.warning(f"Instagram webhook post process_dm - duplicate mid {mid} skipped")
+        return
 
-    have_full_name = False
-    have_phone_number = False
+    found_company_lid = CompanyLid.query.filter_by(company_id=company_id, user_instagram_id=sender_id).first()
 
-    if found_company_lid.full_name is None:
-        send_full_name = get_full_name(message, company_id)
-        print(send_full_name)
-        if send_full_name != "no":
-            have_full_name = True
-            found_company_lid.full_name = send_full_name
-        else:
-            have_full_name = False
-    
-    if found_company_lid.phone_number is None:
-        send_phone_number = get_phone_number(message, company_id)
-        print(send_phone_number)
-        if send_phone_number != "no":
-            have_phone_number = True
-            found_company_lid.phone_number = send_phone_number
+    # Graph API faqat yangi yozuvchilar yoki cache'dagi username eskirganda chaqiriladi.
+    user_username = get_cached_dm_username(sender_id, company_id)
+    username_future = None
+    if user_username is None:
+        username_future = submit_in_app_context(get_dm_username, sender_id, company_id)
+
+    full_name = found_company_lid.full_name if found_company_lid else None
+    phone_number = found_company_lid.phone_number if found_company_lid else None
+
+    if phone_number is None:
+        phone_number = extract_phone_number(message)
+
+    # Oddiy FAQ xabarlar (salom, manzil, ish vaqti) uchun OpenAI chaqirilmaydi.
+    # Shablon faqat suhbat boshida ishlatiladi, davom etayotgan suhbatda kontekst yo'qolmasligi uchun.
+    # Raqamli xabarlarda telefon bo'lishi mumkin - ular extraction'dan o'tadi.
+    use_canned_reply = AI_CANNED_REPLY and extract_phone_number(message) is None and not has_unresolved_digits(message)
+    canned_reply = match_canned_reply(company_id, message) if use_canned_reply else None
+    if canned_reply is not None and get_conversation_history(company_id, sender_id):
+        canned_reply = None
+
+    # Reply cache faqat yangi yozuvchining qisqa, telefonsiz birinchi savoli uchun.
+    reply_flags = (full_name is not None, phone_number is not None)
+    use_reply_cache = AI_REPLY_CACHE and canned_reply is None and found_company_lid is None and phone_number is None and is_cacheable_question(message)
+    cached_reply = get_cached_reply(company_id, message, *reply_flags) if use_reply_cache else None
+
+    lead_reply = None
+    if canned_reply is None and cached_reply is None and AI_COMBINED_MODE:
+        lead_reply = get_ai_lead_reply(sender_id, message, company_id, full_name is not None, phone_number is not None)
+
+    if canned_reply is not None:
+        ai_response = canned_reply
+    elif cached_reply is not None:
+        ai_response = cached_reply
+    elif lead_reply is not None:
+        if full_name is None and lead_reply["name"] != "no":
+            full_name = lead_reply["name"]
+
+        if phone_number is None and lead_reply["phone"] != "no":
+            phone_number = lead_reply["phone"]
+
+        ai_response = lead_reply["reply"]
+    else:
+        full_name_future = submit_in_app_context(get_full_name, message, company_id) if full_name is None else None
+        phone_number_future = submit_in_app_context(get_phone_number, message, company_id) if phone_number is None else None
+
+        # Spekulyativ rejim: javob hozir ma'lum flag'lar bilan darhol boshlanadi,
+        # extraction flag'larni o'zgartirsa qayta yaratiladi (tashlangan javob ham to'liq to'lanadi).
+        speculative_flags = (full_name is not None, phone_number is not None)
+        reply_future = None
+        if AI_SPECULATIVE_REPLY:
+            reply_future = submit_in_app_context(get_ai_reply, sender_id, message, company_id, *speculative_flags)
+
+        if full_name_future is not None:
+            send_full_name = full_name_future.result()
+            print(send_full_name)
+            if send_full_name != "no":
+                full_name = send_full_name
+        
+        if phone_number_future is not None:
+            send_phone_number = phone_number_future.result()
+            print(send_phone_number)
+            if send_phone_number != "no":
+                phone_number = send_phone_number
+
+        have_flags = (full_name is not None, phone_number is not None)
+        if reply_future is not None and have_flags == speculative_flags:
+            ai_response = reply_future.result()
         else:
-            have_phone_number = False
+            if reply_future is not None:
+                sentry_sdk.logger.warning(f"Instagram webhook post process_dm - speculative reply wasted (extra OpenAI call), flags - {have_flags}")
+            ai_response = get_ai_reply(sender_id, message, company_id, *have_flags)
 
-    ai_response = get_ai_reply(sender_id, message, company_id, have_full_name, have_phone_number)
+    # Xabardan ism yoki telefon olinmagan bo'lsa, javob boshqa yozuvchilarga ham mos.
+    if use_reply_cache and cached_reply is None and (full_name is not None, phone_number is not None) == reply_flags:
+        set_cached_reply(company_id, message, *reply_flags, ai_response)
 
-    new_interaction_log = InteractionLog(company_id, sender_id, user_username, "DIRECT", message, ai_response)
+    if username_future is not None:
+        user_username = resolve_dm_username(username_future, found_company_lid)
+
+    # AI javobi kutilayotganda kompaniya o'chirilgan bo'lishi mumkin - yozishdan oldin qulf bilan qayta tekshiriladi.
+    if not is_company_active(company_id, lock=True):
+        db.session.rollback()
+        sentry_sdk.logger.warning(f"Instagram webhook post process_dm - company {company_id} deactivated, reply dropped")
+        return
+
+    if not found_company_lid:
+        found_company_lid = upsert_company_lid(company_id, sender_id, user_username)
+    if found_company_lid.username != user_username:
+        found_company_lid.username = user_username
+
+    if found_company_lid.full_name is None:
+        found_company_lid.full_name = full_name
+    if found_company_lid.phone_number is None:
+        found_company_lid.phone_number = phone_number
+
+    new_interaction_log = InteractionLog(company_id, sender_id, user_username, "DIRECT", message, ai_response, mid=mid)
     db.session.add(new_interaction_log)
-    db.session.commit()
+    try:
+        db.session.flush()
+        add_interaction_rollup(new_interaction_log.id)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        sentry_sdk.logger.warning(f"Instagram webhook post process_dm - duplicate mid {mid} not sent")
+        return
+
+    append_conversation_history(company_id, sender_id, message, ai_response)
 
     sentry_sdk.logger.warning(f"Instagram webhook post process_dm - {new_interaction_log.id}")
     send_dm_reply.delay(sender_id, ai_response, company_id)
@@ -0,0 +1,114 @@
+import os, re
+import sentry_sdk
+from models.ai_config import AiConfig
+from utils.cache_utils import LocalCache
+from services.prompt_service import get_prompt_version
+
+INTENT_CACHE_TTL = int(os.getenv("INTENT_CACHE_TTL", 600))
+INTENT_MATCH_THRESHOLD = float(os.getenv("INTENT_MATCH_THRESHOLD", 0.6))
+INTENT_MATCH_MARGIN = float(os.getenv("INTENT_MATCH_MARGIN", 0.1))
+INTENT_MAX_WORDS = int(os.getenv("INTENT_MAX_WORDS", 6))
+
+intent_cache = LocalCache("company_intent", INTENT_CACHE_TTL)
+
+APOSTROPHE_PATTERN = re.compile(r"[ʻʼ‘’`´]")
+NON_WORD_PATTERN = re.compile(r"[^\w']+")
+# Shablon nomida bir nechta ibora: "Salom, Assalomu alaykum | Hello"
+PHRASE_SEPARATOR_PATTERN = re.compile(r"[,;|/\n]+")
+
+def normalize_text(text):
+    text = APOSTROPHE_PATTERN.sub("'", (text or "").lower())
+    return " ".join(NON_WORD_PATTERN.sub(" ", text).split())
+
+def get_trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def build_intent_index(ai_configs):
+    """
+    use_openai=False shablonlar nomidagi iboralar bo'yicha token va trigram indeksi.
+    """
+    phrases = []
+    trigram_index = {}
+    for cfg in ai_configs:
+        for phrase in PHRASE_SEPARATOR_PATTERN.split(cfg.template_name):
+            phrase = normalize_text(phrase)
+            if not phrase:
+                continue
+
+            trigrams = get_trigrams(phrase)
+            phrase_index = len(phrases)
+            phrases.append({
+                "ai_config_id": cfg.id,
+                "template_name": cfg.template_name,
+                "template_text": cfg.template_text,
+                "tokens": set(phrase.split()),
+                "trigrams": trigrams
+            })
+            for trigram in trigrams:
+                trigram_index.setdefault(trigram, []).append(phrase_index)
+    return {"phrases": phrases, "trigram_index": trigram_index}
+
+def get_intent_index(company_id):
+    company_id = int(company_id)
+    version = get_prompt_version(company_id)
+    item = intent_cache.get(company_id)
+    if item is not None and version is not None and item["version"] == version:
+        return item["index"]
+
+    ai_configs = AiConfig.query.filter_by(company_id=company_id, use_openai=False).all()
+    index = build_intent_index(ai_configs)
+    if version is not None:
+        intent_cache.set(company_id, {"version": version, "index": index})
+    return index
+
+def score_phrase(phrase, tokens, trigrams):
+    # Ibora so'zlari xabarda to'liq bo'lsa - xabarning qancha qismini qoplashi; aks holda trigram Jaccard.
+    if phrase["tokens"] <= tokens:
+        keyword_score = len(phrase["tokens"]) / len(tokens)
+    else:
+        keyword_score = 0.0
+    trigram_score = len(phrase["trigrams"] & trigrams) / len(phrase["trigrams"] | trigrams)
+    return max(keyword_score, trigram_score)
+
+def match_canned_reply(company_id, text):
+    """
+    Qisqa FAQ xabarlarga (salom, manzil, ish vaqti ...) OpenAI'siz shablon javobi. Mos kelmasa None.
+    """
+    normalized = normalize_text(text)
+    tokens = set(normalized.split())
+    if not tokens or len(normalized.split()) > INTENT_MAX_WORDS:
+        return None
+
+    index = get_intent_index(company_id)
+    if not index["phrases"]:
+        return None
+
+    trigrams = get_trigrams(normalized)
+    candidate_indexes = {phrase_index for trigram in trigrams for phrase_index in index["trigram_index"].get(trigram, [])}
+
+    best_scores = {}
+    for phrase_index in candidate_indexes:
+        phrase = index["phrases"][phrase_index]
+        score = score_phrase(phrase, tokens, trigrams)
+        if score > best_scores.get(phrase["ai_config_id"], (0.0, None))[0]:
+            best_scores[phrase["ai_config_id"]] = (score, phrase)
+
+    ranked = sorted(best_scores.values(), key=lambda item: item[0], reverse=True)
+    if not ranked:
+        sentry_sdk.logger.info(f"Intent match = company_id - {company_id}, no candidates")
+        return None
+
+    best_score, best_phrase = ranked[0]
+    second_score = ranked[1][0] if len(ranked) > 1 else 0.0
+    if best_score < INTENT_MATCH_THRESHOLD or best_score - second_score < INTENT_MATCH_MARGIN:
+        sentry_sdk.logger.info(f"Intent match = company_id - {company_id}, no match, best - {best_phrase['template_name']} ({best_score:.2f}), second - {second_score:.2f}")
+        return None
+
+    # Iboradan ortiqcha so'zlar (ism, savol ...) bo'lsa, xabarni AI ko'rishi kerak.
+    if len(tokens) > len(best_phrase["tokens"]):
+        sentry_sdk.logger.info(f"Intent match = company_id - {company_id}, extra words, best - {best_phrase['template_name']} ({best_score:.2f})")
+        return None
+
+    sentry_sdk.logger.info(f"Intent match = company_id - {company_id}, matched - {best_phrase['ai_config_id']} {best_phrase['template_name']} ({best_score:.2f}), second - {second_score:.2f}")
+    return best_phrase["template_text"]
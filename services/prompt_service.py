@@ -0,0 +1,147 @@
+import os, hashlib
+import redis
+import sentry_sdk
+from models.company import Company
+from models.campaign import Campaign
+from models.ai_config import AiConfig
+from utils.cache_utils import LocalCache, publish_invalidation
+from utils.redis_client_config import get_redis_client
+
+PROMPT_CACHE_NAME = "company_prompt"
+PROMPT_CACHE_TTL = int(os.getenv("AI_PROMPT_CACHE_TTL", 600))
+
+prompt_cache = LocalCache(PROMPT_CACHE_NAME, PROMPT_CACHE_TTL)
+
+# Prompt qatlamlari: o'zgarmas ko'rsatmalar -> kompaniya ma'lumotlari -> foydalanuvchi holati.
+# Provider prefix cache'i ishlashi uchun o'zgaruvchan qismlar faqat oxirida bo'ladi.
+STATIC_INSTRUCTIONS = """
+You are a real Instagram manager (22–28 years old).
+You chat like a normal human, not a chatbot.
+
+CONVERSATION FLOW (VERY IMPORTANT):
+- NEVER give all information at once.
+- Answer ONLY what the user asked.
+- If the user asks generally (example: "online kurs bormi"):
+  → confirm shortly and ask what exactly they want (price, duration, format).
+- Give information step by step like a real human.
+- After answering, ask a follow-up question ONLY if it helps move the user closer to registration.
+- Otherwise, end the message without a question.
+- If the user asks for price, duration, or registration:
+    → provide the info and THEN ask for name and phone (if not known yet).
+- If the user shows interest (asks about price, duration, registration) and you don't have their name or phone:
+    → ask for the missing info (name or phone) according to the LEAD RULE below
+    → ONLY ONCE per missing info.
+
+LEAD RULE:
+- Ask for name and phone ONLY ONCE.
+- Ask them only after the user shows interest (price, duration, registration).
+- When asking name or phone, add:
+  "Operatorlarimiz siz bilan bog‘lanib, kurs haqida batafsil ma’lumot beradi."
+- Do NOT add this sentence anywhere else.
+
+STYLE RULES:
+- Short messages
+- No emojis
+- No lists unless necessary
+- Friendly, positive, energetic tone
+- Uzbek → casual Uzbek latin
+- Never sound like a bot
+
+STRICT RULES:
+- Do NOT repeat greetings
+- Do NOT repeat previous answers
+- Do NOT dump all data
+- If info not available: "Bu savol kompaniya materiallarida mavjud emas."
+- If asked for discounts/promotions: "Ayni paytda kompaniyada maxsus aksiyalar mavjud emas."
+- If asked for competitors: "Kechirasiz, bu haqda ma’lumot bera olmayman."
+"""
+
+def build_company_prefix(campaign_texts, ai_templates):
+    return f"""{STATIC_INSTRUCTIONS}
+COMPANY DATA:
+{campaign_texts}
+
+AI CONFIG:
+{ai_templates}
+"""
+
+def build_user_state(have_full_name, have_phone_number, language_instruction):
+    return f"""
+USER DATA:
+- Full name known: {have_full_name}
+- Phone number known: {have_phone_number}
+
+Language rule:
+{language_instruction}
+"""
+
+def get_prompt_version(company_id):
+    try:
+        version = get_redis_client().get(f"ai_prompt_version:{company_id}")
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Prompt version get error - company_id - {company_id} - {str(e)}")
+        return None
+    return int(version) if version else 0
+
+def bump_prompt_version(company_id):
+    """
+    Kompaniya kampaniyalari yoki AI config'lari o'zgarganda chaqiriladi.
+    """
+    if company_id is None:
+        return
+
+    company_id = int(company_id)
+    try:
+        get_redis_client().incr(f"ai_prompt_version:{company_id}")
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Prompt version bump error - company_id - {company_id} - {str(e)}")
+
+    publish_invalidation(PROMPT_CACHE_NAME, company_id)
+
+def get_company_prompt(company_id):
+    """
+    Kompaniya prompt prefiksi (o'zgarmas ko'rsatmalar + kampaniyalar + AI config) va OpenAI token cache orqali.
+    """
+    company_id = int(company_id)
+    # Pub/sub xabari yo'qolsa ham eskirgan prompt qaytmasligi uchun versiya har safar tekshiriladi.
+    version = get_prompt_version(company_id)
+    company_prompt = prompt_cache.get(company_id)
+    if company_prompt is not None and version is not None and company_prompt["version"] == version:
+        return company_prompt
+
+    company = Company.query.filter_by(id=company_id).first()
+
+    campaigns = Campaign.query.filter_by(company_id=company.id, is_active=True).all()
+    campaign_texts = "\n".join([
+        f"- {c.title} - \n\n{c.content}"
+        for c in campaigns
+    ])
+
+    ai_configs = AiConfig.query.filter_by(company_id=company.id).all()
+    ai_templates = "\n".join([
+        f"- [{cfg.template_name}]: {cfg.template_text}"
+        for cfg in ai_configs
+        if cfg.use_openai is True
+    ])
+
+    prefix = build_company_prefix(campaign_texts, ai_templates)
+    company_prompt = {
+        "company_id": company.id,
+        "version": version,
+        "openai_token": company.openai_token,
+        "prefix": prefix,
+        "prefix_hash": hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+    }
+
+    # Qurish paytida versiya o'zgargan bo'lsa, eskirgan ma'lumotni cache'ga yozmaymiz.
+    if version is not None and get_prompt_version(company_id) == version:
+        prompt_cache.set(company_id, company_prompt)
+    return company_prompt
+
+def log_prompt_usage(name, company_prompt, response):
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None) or 0
+
+    sentry_sdk.logger.warning(f"Instagram webhook post {name} = prefix_hash - {company_prompt['prefix_hash']}, prompt_tokens - {prompt_tokens}, cached_tokens - {cached_tokens}")
@@ -0,0 +1,101 @@
+import os, json
+import redis
+import sentry_sdk
+from utils.cache_utils import LocalCache
+from utils.redis_client_config import get_redis_client
+from services.prompt_service import get_prompt_version
+from services.intent_service import normalize_text, get_trigrams
+
+AI_REPLY_CACHE_TTL = int(os.getenv("AI_REPLY_CACHE_TTL", 3600))
+AI_REPLY_CACHE_LOCAL_TTL = int(os.getenv("AI_REPLY_CACHE_LOCAL_TTL", 30))
+AI_REPLY_CACHE_THRESHOLD = float(os.getenv("AI_REPLY_CACHE_THRESHOLD", 0.8))
+AI_REPLY_CACHE_MAX_WORDS = int(os.getenv("AI_REPLY_CACHE_MAX_WORDS", 8))
+AI_REPLY_CACHE_MAX_ENTRIES = int(os.getenv("AI_REPLY_CACHE_MAX_ENTRIES", 500))
+
+reply_index_cache = LocalCache("ai_reply_cache", AI_REPLY_CACHE_LOCAL_TTL)
+
+def get_reply_cache_key(company_id, have_full_name, have_phone_number):
+    """
+    Prompt versiyasi kalitda: kampaniya/AI config o'zgarsa eski javoblar ishlatilmaydi.
+    Eskirish muddatini hash'ning expire'i cheklaydi. Redis ishlamasa None.
+    """
+    version = get_prompt_version(company_id)
+    if version is None:
+        return None
+    return f"ai_reply_cache:{company_id}:{version}:{int(have_full_name)}{int(have_phone_number)}"
+
+def is_cacheable_question(text):
+    normalized = normalize_text(text)
+    return bool(normalized) and len(normalized.split()) <= AI_REPLY_CACHE_MAX_WORDS
+
+def get_reply_index(key):
+    index = reply_index_cache.get(key)
+    if index is not None:
+        return index
+
+    entries = get_redis_client().hgetall(key)
+    index = []
+    for question, reply in entries.items():
+        question = question.decode("utf-8")
+        index.append((question, get_trigrams(question), json.loads(reply)))
+    reply_index_cache.set(key, index)
+    return index
+
+def get_cached_reply(company_id, text, have_full_name, have_phone_number):
+    """
+    Avval aynan shu savol, keyin trigram o'xshashligi (>= AI_REPLY_CACHE_THRESHOLD) bo'yicha saqlangan javob.
+    """
+    normalized = normalize_text(text)
+    try:
+        key = get_reply_cache_key(company_id, have_full_name, have_phone_number)
+        if key is None:
+            return None
+
+        reply = get_redis_client().hget(key, normalized)
+        if reply is not None:
+            sentry_sdk.logger.info(f"AI reply cache = company_id - {company_id}, exact hit")
+            return json.loads(reply)
+
+        index = get_reply_index(key)
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"AI reply cache get error - {str(e)}")
+        return None
+
+    trigrams = get_trigrams(normalized)
+    best_score, best_reply = 0.0, None
+    for question, question_trigrams, reply in index:
+        score = len(trigrams & question_trigrams) / len(trigrams | question_trigrams)
+        if score > best_score:
+            best_score, best_reply = score, reply
+
+    if best_score < AI_REPLY_CACHE_THRESHOLD:
+        sentry_sdk.logger.info(f"AI reply cache = company_id - {company_id}, miss, best - {best_score:.2f}")
+        return None
+
+    sentry_sdk.logger.info(f"AI reply cache = company_id - {company_id}, similar hit - {best_score:.2f}")
+    return best_reply
+
+def set_cached_reply(company_id, text, have_full_name, have_phone_number, reply):
+    normalized = normalize_text(text)
+    try:
+        key = get_reply_cache_key(company_id, have_full_name, have_phone_number)
+        if key is None:
+            return
+
+        redis_client = get_redis_client()
+        pipeline = redis_client.pipeline()
+        # To'lgan bo'lsa tasodifiy bitta savol o'rnini bo'shatadi - cache to'xtab qolmaydi.
+        if redis_client.hlen(key) >= AI_REPLY_CACHE_MAX_ENTRIES:
+            evicted_question = redis_client.hrandfield(key)
+            if evicted_question is not None:
+                pipeline.hdel(key, evicted_question)
+            sentry_sdk.logger.info(f"AI reply cache = company_id - {company_id}, full ({AI_REPLY_CACHE_MAX_ENTRIES}), evicted one entry")
+
+        pipeline.hset(key, normalized, json.dumps(reply))
+        pipeline.expire(key, AI_REPLY_CACHE_TTL)
+        pipeline.execute()
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"AI reply cache set error - {str(e)}")
+        return
+
+    reply_index_cache.delete(key)
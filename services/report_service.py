@@ -0,0 +1,129 @@
+import os
+import pytz
+import sentry_sdk
+from models import db
+from celery import shared_task
+from sqlalchemy import func, exists, select, update, literal
+from datetime import datetime, timedelta
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models.interaction_log import InteractionLog
+from models.interaction_rollup import InteractionRollup
+
+ROLLUP_RECONCILE_HOURS = int(os.getenv("ROLLUP_RECONCILE_HOURS", 48))
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+def get_rollup_hour(created_at):
+    return created_at.replace(tzinfo=None, minute=0, second=0, microsecond=0)
+
+def add_interaction_rollup(interaction_log_id):
+    """
+    Yangi interaction_log qatori uchun rollup'ni oshiradi. Soat bazadagi created_at'dan SQL'da olinadi
+    (Python qiymati DB session TimeZone'iga qarab boshqacha saqlanishi mumkin).
+    Commit qilmaydi - flush'dan keyin chaqiruvchining tranzaksiyasida ishlaydi.
+    """
+    table = InteractionRollup.__table__
+    select_statement = select(
+        InteractionLog.company_id,
+        InteractionLog.interaction_type,
+        func.date_trunc("hour", InteractionLog.created_at),
+        literal(1)
+    ).where(InteractionLog.id == interaction_log_id)
+    insert_statement = pg_insert(table).from_select(["company_id", "interaction_type", "hour", "count"], select_statement)
+    insert_statement = insert_statement.on_conflict_do_update(
+        index_elements=["company_id", "interaction_type", "hour"],
+        set_={"count": table.c["count"] + insert_statement.excluded["count"]}
+    )
+    db.session.execute(insert_statement)
+
+def remove_interaction_rollup(interaction_log_id):
+    """
+    interaction_log qatori o'chirilishidan oldin chaqiriladi. Rollup qatori bo'lmasa hech narsa qilmaydi,
+    son 0 dan pastga tushmaydi.
+    """
+    table = InteractionRollup.__table__
+    update_statement = update(table).where(
+        InteractionLog.id == interaction_log_id,
+        table.c["company_id"] == InteractionLog.company_id,
+        table.c["interaction_type"] == InteractionLog.interaction_type,
+        table.c["hour"] == func.date_trunc("hour", InteractionLog.created_at)
+    ).values(count=func.greatest(table.c["count"] - 1, 0))
+    db.session.execute(update_statement)
+
+def rebuild_interaction_rollup(start, end, company_id=None):
+    """
+    [start, end) soatlari uchun rollup'ni interaction_log'dan qayta hisoblaydi.
+    """
+    hour_column = func.date_trunc("hour", InteractionLog.created_at)
+    select_query = db.session.query(
+        InteractionLog.company_id,
+        InteractionLog.interaction_type,
+        hour_column,
+        func.count(InteractionLog.id)
+    ).filter(InteractionLog.created_at >= start, InteractionLog.created_at < end)
+    stale_query = InteractionRollup.query.filter(InteractionRollup.hour >= start, InteractionRollup.hour < end)
+
+    if company_id is not None:
+        select_query = select_query.filter(InteractionLog.company_id == company_id)
+        stale_query = stale_query.filter(InteractionRollup.company_id == company_id)
+
+    select_query = select_query.group_by(InteractionLog.company_id, InteractionLog.interaction_type, hour_column)
+    insert_statement = pg_insert(InteractionRollup.__table__).from_select(
+        ["company_id", "interaction_type", "hour", "count"],
+        select_query.statement
+    )
+    insert_statement = insert_statement.on_conflict_do_update(
+        index_elements=["company_id", "interaction_type", "hour"],
+        set_={"count": insert_statement.excluded["count"]}
+    )
+    upserted_count = db.session.execute(insert_statement).rowcount
+
+    stale_query = stale_query.filter(~exists().where(
+        InteractionLog.company_id == InteractionRollup.company_id,
+        InteractionLog.interaction_type == InteractionRollup.interaction_type,
+        InteractionLog.created_at >= InteractionRollup.hour,
+        InteractionLog.created_at < InteractionRollup.hour + timedelta(hours=1)
+    ))
+    deleted_count = stale_query.delete(synchronize_session=False)
+
+    db.session.commit()
+    return upserted_count, deleted_count
+
+@shared_task(name="services.report_service.reconcile_interaction_rollup")
+def reconcile_interaction_rollup(start=None, end=None, company_id=None):
+    """
+    Rollup'ni tekshirib tuzatadi. Standart oraliq - oxirgi ROLLUP_RECONCILE_HOURS soat,
+    joriy soatsiz (u hali yozilmoqda, process_dm bilan poyga bo'lmasligi uchun).
+    """
+    current_hour = get_rollup_hour(datetime.now(time_zone))
+    start = get_rollup_hour(datetime.fromisoformat(start)) if start else current_hour - timedelta(hours=ROLLUP_RECONCILE_HOURS)
+    end = get_rollup_hour(datetime.fromisoformat(end)) if end else current_hour
+
+    upserted_count, deleted_count = rebuild_interaction_rollup(start, end, company_id)
+    sentry_sdk.logger.info(f"Interaction rollup reconciled - {start} .. {end}, company_id - {company_id}, upserted {upserted_count}, deleted {deleted_count}")
+    return {"upserted": upserted_count, "deleted": deleted_count}
+
+@shared_task(name="services.report_service.backfill_interaction_rollup")
+def backfill_interaction_rollup(company_id=None, days_per_chunk=30):
+    """
+    Butun tarixni kunlik bo'laklarda rollup'ga yozadi (joriy soatgacha).
+    """
+    first_query = db.session.query(func.min(InteractionLog.created_at))
+    if company_id is not None:
+        first_query = first_query.filter(InteractionLog.company_id == company_id)
+    first_created_at = first_query.scalar()
+    if first_created_at is None:
+        return {"upserted": 0, "deleted": 0}
+
+    current_hour = get_rollup_hour(datetime.now(time_zone))
+    start = get_rollup_hour(first_created_at)
+    total_upserted = total_deleted = 0
+    while start < current_hour:
+        end = min(start + timedelta(days=days_per_chunk), current_hour)
+        upserted_count, deleted_count = rebuild_interaction_rollup(start, end, company_id)
+        total_upserted += upserted_count
+        total_deleted += deleted_count
+        start = end
+
+    sentry_sdk.logger.info(f"Interaction rollup backfilled - company_id - {company_id}, upserted {total_upserted}, deleted {total_deleted}")
+    return {"upserted": total_upserted, "deleted": total_deleted}
@@ -0,0 +1,126 @@
+import os, shutil
+import pytz
+import sentry_sdk
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from models import db
+from celery import shared_task
+from datetime import datetime, date, timedelta
+from models.company import Company
+from models.company_lid import CompanyLid
+from models.interaction_log import InteractionLog
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_CHUNK_SIZE = int(os.getenv("SNAPSHOT_CHUNK_SIZE", 50000))
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+SNAPSHOT_TABLES = {
+    "interaction_log": (InteractionLog, pa.schema([
+        ("id", pa.int64()),
+        ("user_instagram_id", pa.string()),
+        ("username", pa.string()),
+        ("interaction_type", pa.string()),
+        ("message", pa.string()),
+        ("ai_response", pa.string()),
+        ("mid", pa.string()),
+        ("created_at", pa.timestamp("us"))
+    ])),
+    "company_lid": (CompanyLid, pa.schema([
+        ("id", pa.int64()),
+        ("user_instagram_id", pa.string()),
+        ("username", pa.string()),
+        ("full_name", pa.string()),
+        ("phone_number", pa.string()),
+        ("when_call", pa.string()),
+        ("interest", pa.string()),
+        ("status", pa.string()),
+        ("message", pa.string()),
+        ("created_at", pa.timestamp("us"))
+    ]))
+}
+
+def get_snapshot_path(table_name, company_id, snapshot_date):
+    # Hive uslubidagi partitsiya: pandas/pyarrow/duckdb katalogni to'g'ridan-to'g'ri o'qiy oladi.
+    # company_id va date faylda ustun sifatida yo'q - ular katalog nomidan olinadi (turlar to'qnashmasligi uchun).
+    return os.path.join(SNAPSHOT_DIR, table_name, f"company_id={company_id}", f"date={snapshot_date.isoformat()}", "part-0.parquet")
+
+def list_snapshot_dates(table_name, company_id):
+    company_dir = os.path.join(SNAPSHOT_DIR, table_name, f"company_id={company_id}")
+    if not os.path.isdir(company_dir):
+        return []
+    return sorted((name.split("=", 1)[1] for name in os.listdir(company_dir) if name.startswith("date=")), reverse=True)
+
+def delete_company_snapshots(company_id):
+    """
+    O'chirilgan kompaniyaning barcha snapshot kataloglarini diskdan o'chiradi.
+    """
+    for table_name in SNAPSHOT_TABLES:
+        shutil.rmtree(os.path.join(SNAPSHOT_DIR, table_name, f"company_id={company_id}"), ignore_errors=True)
+
+def write_table_snapshot(table_name, company_id, snapshot_date):
+    """
+    Bir kompaniyaning bir kunlik qatorlarini bo'laklab o'qib, bitta Parquet faylga yozadi.
+    Qator bo'lmasa fayl yozilmaydi. Yozilgan qatorlar sonini qaytaradi.
+    """
+    model, schema = SNAPSHOT_TABLES[table_name]
+    start = datetime.combine(snapshot_date, datetime.min.time())
+    query = db.session.query(*[model.__table__.c[field.name] for field in schema]).filter(
+        model.company_id == company_id,
+        model.created_at >= start,
+        model.created_at < start + timedelta(days=1)
+    ).order_by(model.created_at, model.id)
+
+    path = get_snapshot_path(table_name, company_id, snapshot_date)
+    temp_path = f"{path}.tmp"
+    writer = None
+    row_count = 0
+    try:
+        with db.engine.connect() as connection:
+            connection = connection.execution_options(stream_results=True)
+            for chunk in pd.read_sql(query.statement, connection, chunksize=SNAPSHOT_CHUNK_SIZE):
+                if writer is None:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    writer = pq.ParquetWriter(temp_path, schema, compression="snappy")
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                row_count += len(chunk)
+    except Exception:
+        if writer is not None:
+            writer.close()
+            os.remove(temp_path)
+        raise
+
+    if writer is not None:
+        writer.close()
+        # Yuklab olayotgan so'rov chala faylni ko'rmasligi uchun atomik almashtirish.
+        os.replace(temp_path, path)
+    return row_count
+
+@shared_task(name="services.snapshot_service.write_parquet_snapshot")
+def write_parquet_snapshot(company_id=None, snapshot_date=None):
+    """
+    Kunlik Parquet snapshot (standart - kecha, Asia/Tashkent). company_id berilmasa barcha faol kompaniyalar.
+    """
+    if snapshot_date:
+        snapshot_date = date.fromisoformat(snapshot_date)
+    else:
+        snapshot_date = datetime.now(time_zone).date() - timedelta(days=1)
+
+    if company_id is not None:
+        company_id_list = [int(company_id)]
+    else:
+        company_id_list = [company.id for company in Company.query.filter_by(is_active=True).all()]
+
+    result = {}
+    for current_company_id in company_id_list:
+        for table_name in SNAPSHOT_TABLES:
+            try:
+                row_count = write_table_snapshot(table_name, current_company_id, snapshot_date)
+            except Exception as e:
+                sentry_sdk.logger.error(f"Parquet snapshot error - {table_name}, company_id - {current_company_id}, date - {snapshot_date} - {str(e)}")
+                continue
+            result[f"{table_name}:{current_company_id}"] = row_count
+
+    sentry_sdk.logger.info(f"Parquet snapshot written - date - {snapshot_date}, companies - {len(company_id_list)}")
+    return {"date": snapshot_date.isoformat(), "rows": result}
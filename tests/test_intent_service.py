@@ -0,0 +1,59 @@
+import unittest
+import sentry_sdk.logger
+from unittest import mock
+from types import SimpleNamespace
+from services import intent_service
+from services.intent_service import build_intent_index, match_canned_reply, normalize_text, score_phrase, get_trigrams
+
+AI_CONFIGS = [
+    SimpleNamespace(id=1, template_name="Salom, Assalomu alaykum | Hello", template_text="greeting"),
+    SimpleNamespace(id=2, template_name="Manzil, Qayerdasiz", template_text="address"),
+    SimpleNamespace(id=3, template_name="Ish vaqti", template_text="working_hours"),
+    SimpleNamespace(id=4, template_name="Ish joyi", template_text="vacancy")
+]
+
+class MatchCannedReplyTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(intent_service, "get_intent_index", return_value=build_intent_index(AI_CONFIGS))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_exact_phrase(self):
+        self.assertEqual(match_canned_reply(1, "Salom"), "greeting")
+        self.assertEqual(match_canned_reply(1, "Assalomu alaykum!"), "greeting")
+        self.assertEqual(match_canned_reply(1, "manzil"), "address")
+
+    def test_close_spelling_passes_threshold(self):
+        self.assertEqual(match_canned_reply(1, "qayerdasizlar"), "address")
+        self.assertEqual(match_canned_reply(1, "Ish vaqt"), "working_hours")
+
+    def test_below_threshold(self):
+        self.assertIsNone(match_canned_reply(1, "Slom"))
+        self.assertIsNone(match_canned_reply(1, "narxi qancha"))
+
+    def test_ambiguous_match_is_rejected_by_margin(self):
+        # "ish" ikkala shablonga deyarli bir xil mos keladi.
+        self.assertIsNone(match_canned_reply(1, "ish"))
+
+    def test_extra_words_go_to_ai(self):
+        self.assertIsNone(match_canned_reply(1, "Salom, men Aziz"))
+        self.assertIsNone(match_canned_reply(1, "Assalomu alaykum aka"))
+
+    def test_long_or_empty_message(self):
+        self.assertIsNone(match_canned_reply(1, "salom " * (intent_service.INTENT_MAX_WORDS + 1)))
+        self.assertIsNone(match_canned_reply(1, "!!!"))
+
+class ScorePhraseTest(unittest.TestCase):
+
+    def test_keyword_score_is_coverage(self):
+        phrase = build_intent_index(AI_CONFIGS[2:3])["phrases"][0]
+        text = normalize_text("ish vaqti qanaqa")
+        self.assertAlmostEqual(score_phrase(phrase, set(text.split()), get_trigrams(text)), 2 / 3)
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("  O‘zbekcha,  Salom!! "), "o'zbekcha salom")
+        self.assertEqual(normalize_text(None), "")
+
+if __name__ == "__main__":
+    unittest.main()
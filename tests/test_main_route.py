@@ -0,0 +1,33 @@
+import unittest
+from datetime import datetime
+from routes.main_route import floor_to_bucket, format_bucket
+
+class FloorToBucketTest(unittest.TestCase):
+
+    value = datetime(2026, 10, 15, 14, 37, 52, 500)
+
+    def test_buckets(self):
+        self.assertEqual(floor_to_bucket(self.value, "minute"), datetime(2026, 10, 15, 14, 37))
+        self.assertEqual(floor_to_bucket(self.value, "hour"), datetime(2026, 10, 15, 14))
+        self.assertEqual(floor_to_bucket(self.value, "day"), datetime(2026, 10, 15))
+
+    def test_week_starts_on_monday(self):
+        # 2026-10-15 - payshanba, hafta 2026-10-12 dushanbadan boshlanadi.
+        self.assertEqual(floor_to_bucket(self.value, "week"), datetime(2026, 10, 12))
+        self.assertEqual(floor_to_bucket(datetime(2026, 10, 12, 0, 0), "week"), datetime(2026, 10, 12))
+
+    def test_floor_is_idempotent(self):
+        for bucket in ("minute", "hour", "day", "week"):
+            with self.subTest(bucket=bucket):
+                floored = floor_to_bucket(self.value, bucket)
+                self.assertEqual(floor_to_bucket(floored, bucket), floored)
+
+class FormatBucketTest(unittest.TestCase):
+
+    def test_format(self):
+        start, end = datetime(2026, 10, 15, 14), datetime(2026, 10, 15, 15)
+        self.assertEqual(format_bucket(start, end, "hour"), "14:00 - 15:00")
+        self.assertEqual(format_bucket(datetime(2026, 10, 12), datetime(2026, 10, 19), "week"), "2026-10-12 - 2026-10-19")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from utils.phone_utils import normalize_phone_number, extract_phone_number, has_unresolved_digits
+
+PHONE_NUMBER = "+998901234567"
+
+class NormalizePhoneNumberTest(unittest.TestCase):
+
+    def test_accepted_formats(self):
+        for value in ["+998901234567", "998901234567", "+998 90 123 45 67", "8 90 123-45-67", "(90) 123-45-67", "901234567", "90 123 45 67"]:
+            with self.subTest(value=value):
+                self.assertEqual(normalize_phone_number(value), PHONE_NUMBER)
+
+    def test_rejected_values(self):
+        for value in [None, "", "12345", "+7 916 123 45 67", "101234567", "9989012345678"]:
+            with self.subTest(value=value):
+                self.assertIsNone(normalize_phone_number(value))
+
+class ExtractPhoneNumberTest(unittest.TestCase):
+
+    def test_phone_inside_text(self):
+        self.assertEqual(extract_phone_number("Salom, men Aziz, 90 123 45 67"), PHONE_NUMBER)
+        self.assertEqual(extract_phone_number("tel: +998 (90) 123-45-67 ga qo'ng'iroq qiling"), PHONE_NUMBER)
+        self.assertEqual(extract_phone_number("raqamim 8 90 123 45 67"), PHONE_NUMBER)
+
+    def test_date_is_not_joined_to_phone(self):
+        self.assertEqual(extract_phone_number("12.05.2024 901234567"), PHONE_NUMBER)
+        self.assertEqual(extract_phone_number("901234567 12.05.2024"), PHONE_NUMBER)
+
+    def test_foreign_number_is_not_split(self):
+        self.assertIsNone(extract_phone_number("+7 916 123 45 67"))
+
+    def test_no_phone(self):
+        self.assertIsNone(extract_phone_number("narxi qancha?"))
+        self.assertIsNone(extract_phone_number("12.05.2024"))
+
+class HasUnresolvedDigitsTest(unittest.TestCase):
+
+    def test_resolved_phone(self):
+        self.assertFalse(has_unresolved_digits("90 123 45 67"))
+        self.assertFalse(has_unresolved_digits("12.05.2024 901234567"))
+
+    def test_unresolved_digits(self):
+        # Qoidalar topmagan, lekin telefon bo'lishi mumkin - AI extraction'ga yuboriladi.
+        self.assertTrue(has_unresolved_digits("90.123.45.67"))
+        self.assertTrue(has_unresolved_digits("+7 916 123 45 67"))
+
+    def test_short_numbers(self):
+        self.assertFalse(has_unresolved_digits("2 ta kurs, 300 ming"))
+        self.assertFalse(has_unresolved_digits("salom"))
+
+if __name__ == "__main__":
+    unittest.main()
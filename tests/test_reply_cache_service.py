@@ -0,0 +1,59 @@
+import json
+import unittest
+import sentry_sdk.logger
+from unittest import mock
+from utils import cache_utils
+from services import reply_cache_service
+from services.reply_cache_service import get_cached_reply, is_cacheable_question
+
+CACHE_KEY = "ai_reply_cache:1:0:00"
+
+class GetCachedReplyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.redis_client = mock.MagicMock()
+        self.redis_client.hget.return_value = None
+        self.redis_client.hgetall.return_value = {
+            "kurs narxi qancha".encode("utf-8"): json.dumps("Narxi 500 ming."),
+            "manzil qayerda".encode("utf-8"): json.dumps("Chilonzorda.")
+        }
+        for target, value in (("get_redis_client", lambda: self.redis_client), ("get_reply_cache_key", lambda *args: CACHE_KEY)):
+            patcher = mock.patch.object(reply_cache_service, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Worker cache'ning pub/sub listener'i bu testlarda kerak emas.
+        patcher = mock.patch.object(cache_utils, "start_invalidation_listener")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        reply_cache_service.reply_index_cache.clear()
+        self.addCleanup(reply_cache_service.reply_index_cache.clear)
+
+    def test_exact_hit(self):
+        self.redis_client.hget.return_value = json.dumps("Narxi 500 ming.")
+        self.assertEqual(get_cached_reply(1, "Kurs narxi qancha?", False, False), "Narxi 500 ming.")
+        self.redis_client.hget.assert_called_once_with(CACHE_KEY, "kurs narxi qancha")
+
+    def test_similar_question_hit(self):
+        self.assertEqual(get_cached_reply(1, "kurs narxi qanchaa", False, False), "Narxi 500 ming.")
+
+    def test_below_threshold_miss(self):
+        # Trigram o'xshashligi ~0.78 - AI_REPLY_CACHE_THRESHOLD (0.8) dan past.
+        self.assertIsNone(get_cached_reply(1, "kurs narxi qancha ekan", False, False))
+        self.assertIsNone(get_cached_reply(1, "ish vaqti qanaqa", False, False))
+
+    def test_trigram_index_is_cached_locally(self):
+        get_cached_reply(1, "kurs narxi qanchaa", False, False)
+        get_cached_reply(1, "manzil qayerdaa", False, False)
+        self.redis_client.hgetall.assert_called_once_with(CACHE_KEY)
+
+class IsCacheableQuestionTest(unittest.TestCase):
+
+    def test_short_question(self):
+        self.assertTrue(is_cacheable_question("Narxi qancha?"))
+
+    def test_empty_or_long_question(self):
+        self.assertFalse(is_cacheable_question("!!!"))
+        self.assertFalse(is_cacheable_question("so'z " * (reply_cache_service.AI_REPLY_CACHE_MAX_WORDS + 1)))
+
+if __name__ == "__main__":
+    unittest.main()
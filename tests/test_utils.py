@@ -0,0 +1,37 @@
+import unittest
+from datetime import datetime
+from utils.utils import encode_cursor, decode_cursor, parse_tashkent_datetime
+
+class CursorTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        created_at = datetime(2026, 10, 16, 14, 30, 5, 123456)
+        cursor = encode_cursor(created_at, 42)
+        self.assertEqual(decode_cursor(cursor), (created_at, 42))
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(datetime(2026, 10, 16, 23, 59, 59), 10 ** 9)
+        self.assertRegex(cursor, r"^[A-Za-z0-9_\-=]+$")
+
+    def test_invalid_cursor(self):
+        # paginate_query shu xatolarni "Cursor is invalid" javobiga aylantiradi.
+        for cursor in ["not-a-cursor", encode_cursor(datetime(2026, 10, 16), 1)[:-4], "bm90fGF8Yg=="]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises((ValueError, UnicodeError)):
+                    decode_cursor(cursor)
+
+class ParseTashkentDatetimeTest(unittest.TestCase):
+
+    def test_naive_value_is_tashkent_time(self):
+        self.assertEqual(parse_tashkent_datetime("2026-10-16T10:00:00"), datetime(2026, 10, 16, 10))
+        self.assertEqual(parse_tashkent_datetime("2026-10-16"), datetime(2026, 10, 16))
+
+    def test_offset_is_converted(self):
+        self.assertEqual(parse_tashkent_datetime("2026-10-16T00:00:00Z"), datetime(2026, 10, 16, 5))
+        self.assertEqual(parse_tashkent_datetime("2026-10-16T08:00:00+03:00"), datetime(2026, 10, 16, 10))
+
+    def test_invalid_value(self):
+        self.assertIsNone(parse_tashkent_datetime("16.10.2026"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os, json, time, threading
+import redis
+import sentry_sdk
+from utils.redis_client_config import get_redis_client
+
+CACHE_INVALIDATION_CHANNEL = "cache_invalidation"
+
+local_cache_registry = {}
+listener_lock = threading.Lock()
+listener_state = {"pid": None, "thread": None, "retry_at": 0}
+LISTENER_RETRY_SECONDS = 30
+
+class LocalCache:
+    """
+    Worker ichidagi TTL cache. Redis pub/sub orqali barcha worker'larda tozalanadi.
+    """
+
+    def __init__(self, name, ttl):
+        self.name = name
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+        local_cache_registry[name] = self
+
+    def get(self, key):
+        start_invalidation_listener()
+
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+def publish_invalidation(name, key=None):
+    """
+    Local cache kalitini (key=None bo'lsa butun cache'ni) barcha worker'larda o'chirish.
+    """
+    cache = local_cache_registry.get(name)
+    if cache is not None:
+        if key is None:
+            cache.clear()
+        else:
+            cache.delete(key)
+
+    try:
+        get_redis_client().publish(CACHE_INVALIDATION_CHANNEL, json.dumps({"name": name, "key": key}))
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Cache invalidation publish error - {name}, {key} - {str(e)}")
+
+def handle_invalidation_message(message):
+    try:
+        data = json.loads(message["data"])
+    except (TypeError, ValueError):
+        return
+
+    cache = local_cache_registry.get(data.get("name"))
+    if cache is None:
+        return
+
+    if data.get("key") is None:
+        cache.clear()
+    else:
+        cache.delete(data["key"])
+
+def handle_listener_exception(e, pubsub, thread):
+    # Uzilish paytida xabarlar yo'qolgan bo'lishi mumkin: thread to'xtaydi, local cache'lar tozalanadi,
+    # keyingi get() listener'ni qayta ishga tushiradi.
+    sentry_sdk.logger.error(f"Cache invalidation listener stopped - {str(e)}")
+    listener_state["retry_at"] = time.monotonic() + LISTENER_RETRY_SECONDS
+    thread.stop()
+    for cache in list(local_cache_registry.values()):
+        cache.clear()
+
+def is_listener_running(pid):
+    thread = listener_state["thread"]
+    return listener_state["pid"] == pid and thread is not None and thread.is_alive()
+
+def start_invalidation_listener():
+    # Celery prefork worker'larida thread fork'dan keyin har bir jarayonda alohida ishga tushadi.
+    pid = os.getpid()
+    if is_listener_running(pid) or listener_state["retry_at"] > time.monotonic():
+        return
+
+    with listener_lock:
+        if is_listener_running(pid) or listener_state["retry_at"] > time.monotonic():
+            return
+
+        try:
+            pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{CACHE_INVALIDATION_CHANNEL: handle_invalidation_message})
+            listener_state["thread"] = pubsub.run_in_thread(sleep_time=1, daemon=True, exception_handler=handle_listener_exception)
+            listener_state["pid"] = pid
+        except redis.RedisError as e:
+            listener_state["retry_at"] = time.monotonic() + LISTENER_RETRY_SECONDS
+            sentry_sdk.logger.error(f"Cache invalidation listener error - {str(e)}")
@@ -1,14 +1,26 @@
 import os
 from celery import Celery
+from celery.schedules import crontab
 
 def make_celery(app):
     celery = Celery(
         app.import_name,
         broker=os.getenv('CELERY_BROKER_URL'),
         backend=os.getenv('CELERY_RESULT_BACKEND'),
-        include=["services.instagram_service"]
+        include=["services.instagram_service", "services.report_service", "services.snapshot_service", "services.company_service"]
     )
     celery.conf.update(app.config)
+    celery.conf.beat_schedule = {
+        "reconcile-interaction-rollup": {
+            "task": "services.report_service.reconcile_interaction_rollup",
+            "schedule": float(os.getenv("ROLLUP_RECONCILE_INTERVAL", 3600))
+        },
+        "write-parquet-snapshot": {
+            "task": "services.snapshot_service.write_parquet_snapshot",
+            # UTC bo'yicha; 20:00 UTC = 01:00 Asia/Tashkent
+            "schedule": crontab(hour=int(os.getenv("SNAPSHOT_CRON_HOUR", 20)), minute=0)
+        }
+    }
 
     class ContextTask(celery.Task):
         def __call__(self, *args, **kwargs):
@@ -1,20 +1,42 @@
 from functools import wraps
 from models.user import User
 from utils.utils import get_response
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from utils.token_utils import get_token_version
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
-def role_required(role_list):
+def get_current_user_access():
+    """
+    ((role, is_superadmin, company_id), None) yoki (None, xato javobi). Yangi token'larda claim'lar + Redis versiya tekshiruvi,
+    eski (claim'siz) token'larda avvalgidek DB so'rovi.
+    """
+    claims = get_jwt()
+    if "token_version" in claims:
+        if get_token_version(claims["user_id"]) != claims["token_version"]:
+            return None, (get_response("Token has been revoked", None, 401), 401)
+        return (claims["role"], claims["is_superadmin"], claims.get("company_id")), None
+
+    found_user = User.query.filter_by(username=get_jwt_identity()).first()
+    if not found_user:
+        return None, (get_response("User not found", None, 404), 404)
+    return (found_user.role, found_user.is_superadmin, found_user.company_id), None
+
+def role_required(role_list, company_scope=False):
+    """
+    company_scope=True bo'lsa, SUPERADMIN'dan boshqa rollar faqat o'z kompaniyasining (URL'dagi company_id) ma'lumotlariga kira oladi.
+    """
     def decorator(func):
         @wraps(func)
         @jwt_required()
         def wrapper(*args, **kwargs):
-            username = get_jwt_identity()
-
-            found_user = User.query.filter_by(username=username).first()
-            if not found_user:
-                return get_response("User not found", None, 404), 404
+            access, error = get_current_user_access()
+            if error is not None:
+                return error
             
-            if found_user.role not in role_list:
+            role, is_superadmin, company_id = access
+            if role not in role_list:
+                return get_response("Permission denied", None, 403), 403
+
+            if company_scope and role != "SUPERADMIN" and not is_superadmin and str(company_id) != str(kwargs.get("company_id")):
                 return get_response("Permission denied", None, 403), 403
             
             return func(*args, **kwargs)
@@ -26,13 +48,12 @@ def super_admin_required():
         @wraps(func)
         @jwt_required()
         def wrapper(*args, **kwargs):
-            username = get_jwt_identity()
-
-            found_user = User.query.filter_by(username=username).first()
-            if not found_user:
-                return get_response("User not found", None, 404), 404
+            access, error = get_current_user_access()
+            if error is not None:
+                return error
             
-            if not found_user.is_superadmin:
+            _, is_superadmin, _ = access
+            if not is_superadmin:
                 return get_response("Permission denied", None, 403), 403
             
             return func(*args, **kwargs)
@@ -0,0 +1,88 @@
+import os, time, random, threading
+import requests
+import sentry_sdk
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+GRAPH_API_URL = os.getenv("IG_API_URL")
+GRAPH_API_CONNECT_TIMEOUT = float(os.getenv("GRAPH_API_CONNECT_TIMEOUT", 3))
+GRAPH_API_READ_TIMEOUT = float(os.getenv("GRAPH_API_READ_TIMEOUT", 10))
+GRAPH_API_MAX_RETRIES = int(os.getenv("GRAPH_API_MAX_RETRIES", 3))
+GRAPH_API_BACKOFF_BASE = float(os.getenv("GRAPH_API_BACKOFF_BASE", 0.5))
+GRAPH_API_BACKOFF_MAX = float(os.getenv("GRAPH_API_BACKOFF_MAX", 8))
+GRAPH_API_POOL_SIZE = int(os.getenv("GRAPH_API_POOL_SIZE", 20))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# POST (DM yuborish) 5xx'da Instagram tomonidan qabul qilingan bo'lishi mumkin - faqat 429 takrorlanadi.
+POST_RETRY_STATUS_CODES = {429}
+
+graph_session_lock = threading.Lock()
+graph_session_state = {"pid": None, "session": None}
+
+def get_graph_session():
+    """
+    Har bir worker jarayoni uchun bitta keep-alive session (connection pool bilan).
+    """
+    pid = os.getpid()
+    if graph_session_state["pid"] == pid:
+        return graph_session_state["session"]
+
+    with graph_session_lock:
+        if graph_session_state["pid"] != pid:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=GRAPH_API_POOL_SIZE, pool_maxsize=GRAPH_API_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            graph_session_state["session"] = session
+            graph_session_state["pid"] = pid
+    return graph_session_state["session"]
+
+def get_backoff_seconds(attempt, retry_after=None):
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), GRAPH_API_BACKOFF_MAX)
+        except ValueError:
+            pass
+
+    # Full jitter: 0 .. base * 2^attempt
+    return random.uniform(0, min(GRAPH_API_BACKOFF_MAX, GRAPH_API_BACKOFF_BASE * (2 ** attempt)))
+
+def is_connect_error(e):
+    """
+    So'rov serverga umuman yetib bormagan xatolar (ulanish bosqichi).
+    """
+    if isinstance(e, requests.ConnectTimeout):
+        return True
+    reason = getattr(e.args[0], "reason", None) if e.args else None
+    return isinstance(e, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+def graph_request(method, path, params=None, json=None):
+    """
+    Graph API so'rovi: timeout, 5xx/429 da jitter bilan qayta urinish (POST - faqat ulanish xatosi va 429) va javob vaqti log'i.
+    """
+    url = f"{GRAPH_API_URL}{path}"
+    session = get_graph_session()
+
+    for attempt in range(GRAPH_API_MAX_RETRIES + 1):
+        started_at = time.monotonic()
+        try:
+            response = session.request(method, url, params=params, json=json, timeout=(GRAPH_API_CONNECT_TIMEOUT, GRAPH_API_READ_TIMEOUT))
+        except (requests.ConnectionError, requests.Timeout) as e:
+            elapsed_ms = int((time.monotonic() - started_at) * 1000)
+            sentry_sdk.logger.warning(f"Graph API {method} {path} - error - {type(e).__name__}, {elapsed_ms} ms, attempt {attempt + 1}")
+
+            # POST faqat ulanish bosqichidagi xatoda takrorlanadi - aks holda xabar yetib borgan bo'lishi mumkin.
+            retryable = method == "GET" or is_connect_error(e)
+            if not retryable or attempt == GRAPH_API_MAX_RETRIES:
+                raise
+            time.sleep(get_backoff_seconds(attempt))
+            continue
+
+        elapsed_ms = int((time.monotonic() - started_at) * 1000)
+        sentry_sdk.logger.info(f"Graph API {method} {path} - status {response.status_code}, {elapsed_ms} ms, attempt {attempt + 1}")
+
+        retry_status_codes = RETRY_STATUS_CODES if method == "GET" else POST_RETRY_STATUS_CODES
+        if response.status_code in retry_status_codes and attempt < GRAPH_API_MAX_RETRIES:
+            time.sleep(get_backoff_seconds(attempt, response.headers.get("Retry-After")))
+            continue
+        return response
@@ -1,4 +1,17 @@
 import openai, os
+import time, hashlib, threading
+import httpx
+from collections import OrderedDict
+
+OPENAI_CLIENT_MAX_SIZE = int(os.getenv("OPENAI_CLIENT_MAX_SIZE", 64))
+OPENAI_CLIENT_IDLE_TTL = int(os.getenv("OPENAI_CLIENT_IDLE_TTL", 900))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", 30))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", 5))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 2))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", 20))
+
+openai_clients = OrderedDict()
+openai_clients_lock = threading.Lock()
 
 def init_openai():
     openai.api_key = os.getenv("OPENAI_API_KEY")
@@ -6,3 +19,47 @@ def init_openai():
     openai.api_type = os.getenv("OPENAI_API_TYPE")
     openai.api_version = os.getenv("OPENAI_API_VERSION")
     return openai
+
+def create_openai_client(openai_token):
+    http_client = httpx.Client(
+        timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+            keepalive_expiry=OPENAI_CLIENT_IDLE_TTL
+        )
+    )
+    return openai.OpenAI(
+        api_key=openai_token,
+        base_url=os.getenv("OPENAI_API_URL") or None,
+        timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+        max_retries=OPENAI_MAX_RETRIES,
+        http_client=http_client
+    )
+
+def get_openai_client(company_id, openai_token):
+    """
+    Kompaniya uchun uzoq yashaydigan OpenAI client (keep-alive connection pool bilan).
+    Kalit - (company_id, token hash); ishlatilmagan client'lar LRU bo'yicha cache'dan chiqariladi.
+    Chiqarilgan client yopilmaydi - boshqa thread hali so'rov yuborayotgan bo'lishi mumkin, GC o'zi tozalaydi.
+    """
+    key = (int(company_id), hashlib.sha256(openai_token.encode("utf-8")).hexdigest()[:16])
+    now = time.monotonic()
+
+    with openai_clients_lock:
+        for old_key, (_, last_used) in list(openai_clients.items()):
+            if now - last_used <= OPENAI_CLIENT_IDLE_TTL:
+                break
+            del openai_clients[old_key]
+
+        item = openai_clients.get(key)
+        if item is not None:
+            client = item[0]
+            openai_clients.move_to_end(key)
+        else:
+            client = create_openai_client(openai_token)
+        openai_clients[key] = (client, now)
+
+        while len(openai_clients) > OPENAI_CLIENT_MAX_SIZE:
+            openai_clients.popitem(last=False)
+    return client
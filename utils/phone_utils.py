@@ -0,0 +1,73 @@
+import re
+
+UZ_COUNTRY_CODE = "998"
+UZ_OPERATOR_CODES = {
+    "20", "33", "50", "55", "61", "62", "65", "66", "67", "69", "70", "71", "72",
+    "73", "74", "75", "76", "77", "78", "79", "88", "90", "91", "93", "94", "95",
+    "97", "98", "99"
+}
+MIN_PHONE_DIGITS = 7
+
+# Nuqta ajratuvchi emas: "12.05.2024" kabi sanalar raqamga qo'shilib ketmasin.
+PHONE_CANDIDATE_PATTERN = re.compile(r"\+?\d[\d\s\-()]*\d")
+# Qoidalar topa olmagan raqamlarni aniqlash uchun kengroq (nuqtali "90.123.45.67" ham).
+DIGIT_SEQUENCE_PATTERN = re.compile(r"\+?\d[\d\s\-().]*\d")
+
+def normalize_phone_number(value):
+    """
+    Telefon raqamni E.164 (+998XXXXXXXXX) ko'rinishiga keltirish.
+    O'zbekiston raqami bo'lmasa None qaytaradi.
+    """
+    if not value:
+        return None
+
+    digits = re.sub(r"\D", "", value)
+    if len(digits) == 12 and digits.startswith(UZ_COUNTRY_CODE):
+        local = digits[3:]
+    elif len(digits) == 10 and digits.startswith("8"):
+        local = digits[1:]
+    elif len(digits) == 9:
+        local = digits
+    else:
+        return None
+
+    if local[:2] not in UZ_OPERATOR_CODES:
+        return None
+    return f"+{UZ_COUNTRY_CODE}{local}"
+
+def resolve_phone_candidate(candidate):
+    """
+    Nomzod butunligicha raqam bo'lmasa, boshidan yoki oxiridan bo'shliq bilan ajratilgan bo'laklar
+    olib tashlanadi ("2024 901234567" -> 901234567). "+" bilan boshlangan nomzod bo'linmaydi.
+    """
+    phone_number = normalize_phone_number(candidate)
+    if phone_number or candidate.startswith("+"):
+        return phone_number
+
+    groups = candidate.split()
+    for size in range(len(groups) - 1, 0, -1):
+        for part in (groups[len(groups) - size:], groups[:size]):
+            phone_number = normalize_phone_number(" ".join(part))
+            if phone_number:
+                return phone_number
+    return None
+
+def extract_phone_number(text):
+    """
+    Matndan telefon raqamni qoidalar bilan topish (+998, 9 xonali, bo'shliq/chiziqcha/qavslar).
+    """
+    for candidate in PHONE_CANDIDATE_PATTERN.findall(text):
+        phone_number = resolve_phone_candidate(candidate)
+        if phone_number:
+            return phone_number
+    return None
+
+def has_unresolved_digits(text):
+    """
+    Matnda telefon bo'lishi mumkin bo'lgan, lekin qoidalar aniqlay olmagan raqamlar bormi.
+    """
+    for candidate in DIGIT_SEQUENCE_PATTERN.findall(text):
+        digits = re.sub(r"\D", "", candidate)
+        if len(digits) >= MIN_PHONE_DIGITS and extract_phone_number(candidate) is None:
+            return True
+    return False
@@ -1,4 +1,13 @@
 import redis, os
 
+redis_client = None
+
 def init_redis_client():
-    return redis.Redis.from_url(os.getenv('REDIS_URL'))
+    global redis_client
+    redis_client = redis.Redis.from_url(os.getenv('REDIS_URL'))
+    return redis_client
+
+def get_redis_client():
+    if redis_client is None:
+        return init_redis_client()
+    return redis_client
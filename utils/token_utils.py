@@ -0,0 +1,59 @@
+import os
+import redis
+import sentry_sdk
+from models import db
+from models.user import User
+from utils.redis_client_config import get_redis_client
+
+TOKEN_VERSION_TTL = int(os.getenv("TOKEN_VERSION_TTL", 3600))
+
+# Foydalanuvchi o'chirilgan yoki nofaol - hech bir token versiyasiga mos kelmaydi.
+REVOKED_TOKEN_VERSION = -1
+
+def get_token_version_key(user_id):
+    return f"token_version:{user_id}"
+
+def get_user_claims(user):
+    return {
+        "user_id": user.id,
+        "role": user.role,
+        "company_id": user.company_id,
+        "is_superadmin": bool(user.is_superadmin),
+        "token_version": user.token_version or 0
+    }
+
+def get_token_version(user_id):
+    """
+    Foydalanuvchining joriy token versiyasi: Redis'dan, bo'lmasa (yoki Redis ishlamasa) DB'dan.
+    """
+    try:
+        version = get_redis_client().get(get_token_version_key(user_id))
+        if version is not None:
+            return int(version)
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Token version get error - {str(e)}")
+
+    found_user = db.session.query(User.token_version, User.is_active).filter(User.id == user_id).first()
+    if not found_user or not found_user.is_active:
+        version = REVOKED_TOKEN_VERSION
+    else:
+        version = found_user.token_version or 0
+
+    try:
+        get_redis_client().set(get_token_version_key(user_id), version, ex=TOKEN_VERSION_TTL)
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Token version set error - {str(e)}")
+    return version
+
+def bump_token_version(user):
+    # Commit'dan oldin chaqiriladi; Redis kaliti commit'dan keyin forget_token_version bilan o'chiriladi.
+    user.token_version = (user.token_version or 0) + 1
+
+def forget_token_version(*user_ids):
+    if not user_ids:
+        return
+
+    try:
+        get_redis_client().delete(*[get_token_version_key(user_id) for user_id in user_ids])
+    except redis.RedisError as e:
+        sentry_sdk.logger.error(f"Token version delete error - {str(e)}")
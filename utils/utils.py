@@ -1,5 +1,18 @@
-import os
+import os, base64
+import pytz
+from datetime import datetime
+from sqlalchemy import tuple_
 from dotenv import load_dotenv
+from flask_restful import reqparse
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+PAGE_DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", 50))
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", 200))
+
+page_parse = reqparse.RequestParser()
+page_parse.add_argument("cursor", type=str, location="args")
+page_parse.add_argument("limit", type=int, location="args")
 
 def get_response(message, result, status_code):
     _ = {
@@ -9,6 +22,62 @@ def get_response(message, result, status_code):
     }
     return _
 
+def parse_tashkent_datetime(value):
+    """
+    ISO sana/vaqtni bazadagi created_at kabi Asia/Tashkent naive vaqtiga o'tkazadi.
+    Offset ('Z', '+00:00') berilsa Toshkentga aylantiriladi, bo'lmasa Toshkent vaqti deb olinadi. Xato bo'lsa None.
+    """
+    try:
+        value = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(time_zone)
+    return value.replace(tzinfo=None)
+
+def get_page_response(message, result, next_cursor, status_code):
+    _ = get_response(message, result, status_code)
+    _["next_cursor"] = next_cursor
+    return _
+
+def encode_cursor(created_at, id):
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{id}".encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor):
+    created_at, id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+    return datetime.fromisoformat(created_at), int(id)
+
+def paginate_query(query, model):
+    """
+    Keyset pagination (created_at, id) bo'yicha, eng yangisi birinchi.
+    (list, next_cursor) qaytaradi; cursor yoki limit noto'g'ri bo'lsa xabar matnini.
+    """
+    data = page_parse.parse_args()
+    limit = data.get("limit") or PAGE_DEFAULT_LIMIT
+    if limit < 1:
+        return "Limit must be positive"
+    limit = min(limit, PAGE_MAX_LIMIT)
+
+    if data.get("cursor"):
+        try:
+            created_at, id = decode_cursor(data["cursor"])
+        except (ValueError, UnicodeError):
+            return "Cursor is invalid"
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, id))
+
+    item_list = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(item_list) > limit:
+        item_list = item_list[:limit]
+        next_cursor = encode_cursor(item_list[-1].created_at, item_list[-1].id)
+    return item_list, next_cursor
+
+def get_env_bool(name, default=False):
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
 def super_admin_create():
     from models import db
     from models.user import User
@@ -16,16 +85,21 @@ def super_admin_create():
 
     load_dotenv()
 
-    found_company = Company.query.filter_by(title="AiConnect").first()
-    if not found_company:
+    # Faqat kerakli ustunlar: app import paytida chaqiriladi, migratsiya qo'shadigan ustunlar
+    # hali bazada bo'lmasligi mumkin (aks holda `flask db upgrade` ham ishga tushmaydi).
+    found_company = db.session.query(Company.id).filter_by(title="AiConnect").first()
+    if found_company:
+        company_id = found_company.id
+    else:
         ai_connect_company = Company("AiConnect", "AiConnect Company", "+998909380018", "akbarovakbar888@gmail.com", "Uzbekistan, Tashkent, Alisher Navoi, 35.", os.getenv("IG_ID"), os.getenv("IG_ACCESS_TOKEN"), os.getenv("OPENAI_API_KEY"), logo_path="https://firebasestorage.googleapis.com/v0/b/kamronlessonbot.appspot.com/o/aiconnect%2Fcompany_logo%2Fai_connect_logo.png?alt=media&token=e6ad1d3e-d00e-49c7-8fab-98f60d94e8a6")
         db.session.add(ai_connect_company)
         db.session.commit()
+        company_id = ai_connect_company.id
         print("Successfully created AiConnect company, Akbarov.")
     
-    found_user = User.query.filter_by(username="akbarov504", phone_number="+998909380018").first()
+    found_user = db.session.query(User.id).filter_by(username="akbarov504", phone_number="+998909380018").first()
     if not found_user:
-        super_admin = User(ai_connect_company.id, os.getenv("SUPERADMIN_FULL_NAME"), os.getenv("SUPERADMIN_USERNAME"), os.getenv("SUPERADMIN_PHONE"), "SUPERADMIN", os.getenv("SUPERADMIN_PASSWORD"), is_superadmin=True)
+        super_admin = User(company_id, os.getenv("SUPERADMIN_FULL_NAME"), os.getenv("SUPERADMIN_USERNAME"), os.getenv("SUPERADMIN_PHONE"), "SUPERADMIN", os.getenv("SUPERADMIN_PASSWORD"), is_superadmin=True)
         db.session.add(super_admin)
         db.session.commit()
         print("Successfully created Super Admin, Akbarov.")